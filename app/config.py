@@ -1,15 +1,23 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 
 from dotenv import load_dotenv
 import os
-
+import re
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Список id через запятую; пустые элементы допустимы. При любом мусоре список админов пуст
+_ADMIN_IDS_FORMAT = re.compile(r"(?:\s*(?:-?\d+)?\s*,)*\s*(?:-?\d+)?\s*")
+_ADMIN_ID = re.compile(r"-?\d+")
+
+# Соединений-читателей SQLite по умолчанию (передаётся в Database)
+DEFAULT_DB_READERS = 4
+
 
 @dataclass(frozen=True)
 class Config:
@@ -17,14 +25,17 @@ class Config:
     db_path: Path
     timezone: str
     log_level: str
-    admin_ids: list[int]
+    admin_ids: frozenset[int]
     yoomoney_wallet_id: str  # Номер кошелька ЮMoney
     yoomoney_api_token: str
     yoomoney_secret_key: str
     yoomoney_test_mode: bool = True
+    db_readers: int = DEFAULT_DB_READERS  # Размер пула соединений-читателей SQLite
 
 
+@lru_cache(maxsize=1)
 def load_config() -> Config:
+    """Окружение не меняется после старта процесса, поэтому конфиг читается один раз."""
     load_dotenv(BASE_DIR / ".env")
     bot_token = os.getenv("BOT_TOKEN", "").strip()
     if not bot_token:
@@ -32,15 +43,13 @@ def load_config() -> Config:
     db_path = Path(os.getenv("DB_PATH", BASE_DIR / "data" / "discipline_bot.sqlite3"))
     timezone = os.getenv("TIMEZONE", "Europe/Moscow")
     log_level = os.getenv("LOG_LEVEL", "INFO")
+    db_readers = int(os.getenv("DB_READERS", str(DEFAULT_DB_READERS)))
     
     # Парсим список админов
     admin_ids_str = os.getenv("ADMIN_IDS", "").strip()
-    admin_ids = []
-    if admin_ids_str:
-        try:
-            admin_ids = [int(uid.strip()) for uid in admin_ids_str.split(",") if uid.strip()]
-        except ValueError:
-            admin_ids = []
+    admin_ids: frozenset[int] = frozenset()
+    if admin_ids_str and _ADMIN_IDS_FORMAT.fullmatch(admin_ids_str):
+        admin_ids = frozenset(map(int, _ADMIN_ID.findall(admin_ids_str)))
     
     # Настройки ЮMoney
     yoomoney_wallet_id = os.getenv("YOOMONEY_WALLET_ID", "").strip()
@@ -62,4 +71,5 @@ def load_config() -> Config:
         yoomoney_api_token=yoomoney_api_token,
         yoomoney_secret_key=yoomoney_secret_key,
         yoomoney_test_mode=yoomoney_test_mode,
+        db_readers=db_readers,
     )
@@ -1,115 +1,441 @@
 from __future__ import annotations
 
+import asyncio
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+import logging
+from datetime import datetime, tzinfo
+
 import aiosqlite
-from typing import Any, Iterable, Optional
+
+from app.db.cache import TTLCache
+from typing import Any, AsyncIterator, Iterable, Optional, Sequence
+
+
+logger = logging.getLogger(__name__)
+
+
+# База и задача-владелец открытой транзакции (execute внутри неё не коммитит).
+# Контекст наследуют задачи, созданные внутри блока (gather, create_task, call_soon), поэтому
+# к транзакции присоединяется только сама задача-владелец — остальные ждут блокировку писателя
+_current_transaction: ContextVar[Optional[tuple["Database", Optional[asyncio.Task[Any]]]]] = ContextVar(
+    "db_transaction", default=None
+)
+
+# WAL: читатели не блокируют писателя; synchronous=NORMAL в WAL безопасен и убирает fsync на каждый коммит
+DEFAULT_PRAGMAS: tuple[str, ...] = (
+    "journal_mode = WAL",
+    "synchronous = NORMAL",
+    "temp_store = MEMORY",
+    "cache_size = -64000",
+    "mmap_size = 268435456",
+    "busy_timeout = 5000",
+    "foreign_keys = ON",
+)
+DEFAULT_READERS = 4
+# sqlite3 держит LRU подготовленных выражений по тексту SQL; с запасом, чтобы динамические
+# запросы (IN (...), UPDATE по набору полей) не вытесняли постоянные
+STATEMENT_CACHE_SIZE = 256
+# Кэш пользователей и настроек: записи через queries сбрасывают его сразу, TTL ограничивает остальное
+USER_CACHE_SIZE = 10_000
+CACHE_TTL_SECONDS = 60
+# Лимит связанных параметров в одном запросе у SQLite по умолчанию
+MAX_SQL_PARAMS = 999
 
 
 class Database:
-    def __init__(self, db_path: str) -> None:
+    """
+    Одно соединение-писатель и пул соединений-читателей.
+    В режиме WAL читатели работают параллельно друг с другом и с писателем.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        pragmas: Iterable[str] = DEFAULT_PRAGMAS,
+        readers: int = DEFAULT_READERS,
+    ) -> None:
         self._db_path = db_path
+        self._pragmas = tuple(pragmas)
+        # У каждой :memory: базы своё содержимое — читатели бы её не увидели
+        self._readers_count = 0 if db_path == ":memory:" else max(0, readers)
         self._conn: Optional[aiosqlite.Connection] = None
+        self._readers: list[aiosqlite.Connection] = []
+        self._reader_pool: Optional[asyncio.Queue[aiosqlite.Connection]] = None
+        self._write_lock = asyncio.Lock()
+        # tg_id -> строка users; id -> tg_id (не меняется, поэтому без TTL)
+        self.user_cache: TTLCache[int, dict] = TTLCache(USER_CACHE_SIZE, CACHE_TTL_SECONDS)
+        self.user_tg_ids: dict[int, int] = {}
+        # Растёт при каждой записи в users: чтение, начатое до записи, не кладёт в кэш старую строку
+        self.user_cache_generation = 0
+        # key -> значение настройки (и разобранные значения, см. queries.get_subscription_price)
+        self.settings_cache: TTLCache[object, Any] = TTLCache(64, CACHE_TTL_SECONDS)
+
+    async def _open_connection(self, reader: bool = False) -> aiosqlite.Connection:
+        conn = await aiosqlite.connect(self._db_path, cached_statements=STATEMENT_CACHE_SIZE)
+        conn.row_factory = aiosqlite.Row
+        # Читатели только читают: случайная запись через fetch_* упадёт, а не обойдёт блокировку писателя
+        pragmas = self._pragmas + ("query_only = ON",) if reader else self._pragmas
+        # Все PRAGMA одним скриптом — один проход через поток aiosqlite
+        await conn.executescript("".join(f"PRAGMA {pragma};" for pragma in pragmas))
+        return conn
 
     async def connect(self) -> None:
         if self._conn is not None:
             return
-        self._conn = await aiosqlite.connect(self._db_path)
-        self._conn.row_factory = aiosqlite.Row
-        await self._conn.execute("PRAGMA foreign_keys = ON;")
-        await self._conn.commit()
+        self._conn = await self._open_connection()
+        pool: asyncio.Queue[aiosqlite.Connection] = asyncio.Queue()
+        for _ in range(self._readers_count):
+            reader = await self._open_connection(reader=True)
+            self._readers.append(reader)
+            pool.put_nowait(reader)
+        self._reader_pool = pool
+
+    async def prepare_statements(self, statements: Iterable[str]) -> None:
+        """
+        Прогреть кэш подготовленных выражений читателей: каждый SELECT выполняется с NULL-параметрами
+        (пустой результат), и следующий такой же запрос не тратит время на разбор и план.
+        """
+        statements = tuple(statements)
+        for conn in self._readers or ([self._conn] if self._conn is not None else []):
+            for sql in statements:
+                async with conn.execute(sql, [None] * sql.count("?")) as cursor:
+                    await cursor.fetchall()
 
     async def close(self) -> None:
         if self._conn is None:
             return
+        for reader in self._readers:
+            await reader.close()
+        self._readers.clear()
+        self._reader_pool = None
         await self._conn.close()
         self._conn = None
 
+    def _in_transaction(self) -> bool:
+        """Текущая задача сама открыла транзакцию этой базы."""
+        owner = _current_transaction.get()
+        return owner is not None and owner[0] is self and owner[1] is asyncio.current_task()
+
+    @asynccontextmanager
+    async def acquire_reader(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Соединение для чтения из пула (без пула — писатель)."""
+        if self._conn is None:
+            raise RuntimeError("Database is not connected")
+        # Внутри своей транзакции читаем через писателя, чтобы видеть незакоммиченные изменения
+        if not self._readers or self._reader_pool is None or self._in_transaction():
+            yield self._conn
+            return
+        pool = self._reader_pool
+        conn = await pool.get()
+        try:
+            yield conn
+        finally:
+            pool.put_nowait(conn)
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[None]:
+        """
+        Объединяет все записи внутри блока в одну транзакцию (один COMMIT вместо коммита на каждый запрос).
+        Вложенный вызов присоединяется к внешней транзакции.
+        """
+        if self._conn is None:
+            raise RuntimeError("Database is not connected")
+        if self._in_transaction():
+            yield
+            return
+        async with self._write_lock:
+            token = _current_transaction.set((self, asyncio.current_task()))
+            try:
+                await self._conn.execute("BEGIN;")
+                try:
+                    yield
+                except BaseException:
+                    await self._conn.rollback()
+                    raise
+                await self._conn.commit()
+            finally:
+                _current_transaction.reset(token)
+
     async def execute(self, query: str, params: Iterable[Any] | None = None) -> None:
         if self._conn is None:
             raise RuntimeError("Database is not connected")
-        await self._conn.execute(query, params or [])
-        await self._conn.commit()
+        if self._in_transaction():
+            await self._conn.execute(query, params or [])
+            return
+        async with self._write_lock:
+            await self._conn.execute(query, params or [])
+            await self._conn.commit()
 
     async def execute_many(self, query: str, params: Iterable[Iterable[Any]]) -> None:
+        """executemany без коммита — только внутри transaction()."""
         if self._conn is None:
             raise RuntimeError("Database is not connected")
+        if not self._in_transaction():
+            raise RuntimeError("execute_many requires an open transaction")
         await self._conn.executemany(query, params)
-        await self._conn.commit()
 
-    async def fetch_one(self, query: str, params: Iterable[Any] | None = None) -> Optional[aiosqlite.Row]:
+    async def execute_many_commit(self, query: str, params: Iterable[Iterable[Any]]) -> None:
+        async with self.transaction():
+            await self.execute_many(query, params)
+
+    async def insert_many(self, insert: str, rows: Sequence[Sequence[Any]]) -> None:
+        """
+        Массовая вставка multi-row VALUES: insert — "INSERT ... (колонки)" без VALUES.
+        Строки режутся на пачки так, чтобы параметров в запросе было не больше MAX_SQL_PARAMS.
+        """
+        if not rows:
+            return
+        width = len(rows[0])
+        batch_size = MAX_SQL_PARAMS // width
+        placeholders = "(" + ", ".join(["?"] * width) + ")"
+        async with self.transaction():
+            for start in range(0, len(rows), batch_size):
+                batch = rows[start : start + batch_size]
+                await self.execute(
+                    f"{insert} VALUES {', '.join([placeholders] * len(batch))};",
+                    [param for row in batch for param in row],
+                )
+
+    async def execute_returning(self, query: str, params: Iterable[Any] | None = None) -> Optional[aiosqlite.Row]:
+        """Запись с RETURNING через писателя; возвращает первую строку результата."""
         if self._conn is None:
             raise RuntimeError("Database is not connected")
-        async with self._conn.execute(query, params or []) as cursor:
-            return await cursor.fetchone()
+        if self._in_transaction():
+            async with self._conn.execute(query, params or []) as cursor:
+                return await cursor.fetchone()
+        async with self._write_lock:
+            async with self._conn.execute(query, params or []) as cursor:
+                row = await cursor.fetchone()
+            await self._conn.commit()
+        return row
 
-    async def fetch_all(self, query: str, params: Iterable[Any] | None = None) -> list[aiosqlite.Row]:
+    async def execute_script(self, script: str) -> None:
+        """
+        Несколько выражений одним вызовом executescript — один проход через поток aiosqlite.
+        Скрипт выполняется в своей транзакции, поэтому внутри transaction() вызывать нельзя.
+        """
         if self._conn is None:
             raise RuntimeError("Database is not connected")
-        async with self._conn.execute(query, params or []) as cursor:
-            rows = await cursor.fetchall()
-        return list(rows)
+        if self._in_transaction():
+            raise RuntimeError("execute_script cannot run inside a transaction")
+        async with self._write_lock:
+            try:
+                await self._conn.executescript(f"BEGIN;{script}COMMIT;")
+            except BaseException:
+                await self._conn.rollback()
+                raise
 
+    async def fetch_one(self, query: str, params: Iterable[Any] | None = None) -> Optional[aiosqlite.Row]:
+        async with self.acquire_reader() as conn:
+            async with conn.execute(query, params or []) as cursor:
+                return await cursor.fetchone()
+
+    async def fetch_all(self, query: str, params: Iterable[Any] | None = None) -> list[aiosqlite.Row]:
+        async with self.acquire_reader() as conn:
+            async with conn.execute(query, params or []) as cursor:
+                # sqlite3 уже отдаёт list — без лишней копии
+                return await cursor.fetchall()
 
-async def _column_exists(db: Database, table: str, column: str) -> bool:
+    async def iter_rows(
+        self,
+        query: str,
+        params: Iterable[Any] | None = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[aiosqlite.Row]:
+        """Построчный обход результата пачками по batch_size — без загрузки всей выборки в память."""
+        async with self.acquire_reader() as conn:
+            async with conn.execute(query, params or []) as cursor:
+                while True:
+                    rows = await cursor.fetchmany(batch_size)
+                    if not rows:
+                        return
+                    for row in rows:
+                        yield row
+
+
+async def _table_columns(db: Database, table: str) -> dict[str, str]:
+    """Колонки таблицы: имя -> объявленный тип."""
     rows = await db.fetch_all(f"PRAGMA table_info({table});")
-    return any(row["name"] == column for row in rows)
+    return {row["name"]: row["type"].upper() for row in rows}
 
 
-async def init_db(db: Database) -> None:
-    await db.execute(
-        """
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            tg_id INTEGER NOT NULL UNIQUE,
-            target_weight REAL,
-            week_parity_offset INTEGER,
-            created_at TEXT NOT NULL
-        );
-        """
-    )
-    await db.execute(
-        """
-        CREATE TABLE IF NOT EXISTS workout_schedule (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER NOT NULL,
-            weekday INTEGER NOT NULL,
-            time TEXT NOT NULL,
-            week_type TEXT NOT NULL DEFAULT 'any',
-            UNIQUE(user_id, weekday, time, week_type),
-            FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE
-        );
-        """
-    )
-    await db.execute(
-        """
-        CREATE TABLE IF NOT EXISTS workout_logs (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER NOT NULL,
-            date TEXT NOT NULL,
-            status TEXT NOT NULL,
-            duration INTEGER,
-            notes TEXT,
-            FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE
-        );
-        """
-    )
-    await db.execute(
-        """
-        CREATE TABLE IF NOT EXISTS weights (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER NOT NULL,
-            date TEXT NOT NULL,
-            weight REAL NOT NULL,
-            FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE
-        );
-        """
+# Базовая схема: только идемпотентные CREATE ... IF NOT EXISTS, выполняются одним executescript
+_SCHEMA_SCRIPT = """
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    tg_id INTEGER NOT NULL UNIQUE,
+    target_weight REAL,
+    week_parity_offset INTEGER,
+    created_at TEXT NOT NULL
+);
+-- Список последних пользователей в админке: ORDER BY created_at DESC LIMIT 50 без сортировки всей таблицы
+CREATE INDEX IF NOT EXISTS idx_users_created_at ON users(created_at);
+
+-- Автоиндекс UNIQUE(user_id, weekday, time, week_type) — покрывающий для get_workout_schedule:
+-- поиск по user_id и ORDER BY weekday, time идут по нему без сортировки, отдельный индекс не нужен
+CREATE TABLE IF NOT EXISTS workout_schedule (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    weekday INTEGER NOT NULL,
+    time TEXT NOT NULL,
+    week_type TEXT NOT NULL DEFAULT 'any',
+    UNIQUE(user_id, weekday, time, week_type),
+    FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS workout_logs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    date INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    duration INTEGER,
+    notes TEXT,
+    FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS weights (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    date INTEGER NOT NULL,
+    weight REAL NOT NULL,
+    FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS idx_weights_user_date ON weights(user_id, date);
+
+CREATE TABLE IF NOT EXISTS calorie_logs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    date TEXT NOT NULL,
+    calories INTEGER NOT NULL,
+    created_at TEXT NOT NULL,
+    FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS idx_calorie_logs_user_date ON calorie_logs(user_id, date);
+
+-- Таблица платежей
+CREATE TABLE IF NOT EXISTS payments (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    payment_id TEXT NOT NULL UNIQUE,
+    amount REAL NOT NULL,
+    currency TEXT NOT NULL DEFAULT 'RUB',
+    status TEXT NOT NULL,
+    payment_method_id TEXT,
+    created_at TEXT NOT NULL,
+    paid_at TEXT,
+    FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS idx_payments_user_id ON payments(user_id);
+CREATE INDEX IF NOT EXISTS idx_payments_payment_id ON payments(payment_id);
+CREATE INDEX IF NOT EXISTS idx_payments_status ON payments(status);
+
+-- Таблица рекуррентных подписок
+CREATE TABLE IF NOT EXISTS recurring_subscriptions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL UNIQUE,
+    payment_method_id TEXT NOT NULL,
+    amount REAL NOT NULL,
+    currency TEXT NOT NULL DEFAULT 'RUB',
+    next_payment_date TEXT NOT NULL,
+    is_active INTEGER NOT NULL DEFAULT 1,
+    created_at TEXT NOT NULL,
+    FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS idx_recurring_user_id ON recurring_subscriptions(user_id);
+-- Выборка подписок к списанию: is_active = 1 AND next_payment_date <= ?
+DROP INDEX IF EXISTS idx_recurring_next_payment;
+CREATE INDEX IF NOT EXISTS idx_recurring_active_next ON recurring_subscriptions(is_active, next_payment_date);
+
+-- Таблица настроек (глобальные настройки бота)
+CREATE TABLE IF NOT EXISTS settings (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+"""
+
+
+async def init_db(db: Database, tz: Optional[tzinfo] = None) -> None:
+    # Базовая схема — один вызов executescript; миграции зависят от текущей схемы и идут отдельной транзакцией
+    await db.execute_script(_SCHEMA_SCRIPT)
+    async with db.transaction():
+        await _migrate_schema(db, tz)
+    # Обновить статистику планировщика для новых индексов (ANALYZE выполняется только при необходимости)
+    await db.execute("PRAGMA optimize;")
+
+
+async def _migrate_schema(db: Database, tz: Optional[tzinfo]) -> None:
+    # Даты тренировок и взвешиваний хранятся unix-временем (INTEGER) вместо ISO-строк
+    if (await _table_columns(db, "workout_logs"))["date"] == "TEXT":
+        await _rebuild_with_unix_dates(
+            db,
+            "workout_logs",
+            """
+            CREATE TABLE workout_logs_new (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                date INTEGER NOT NULL,
+                status TEXT NOT NULL,
+                duration INTEGER,
+                notes TEXT,
+                FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE
+            );
+            """,
+            ("id", "user_id", "date", "status", "duration", "notes"),
+            tz,
+        )
+
+    if (await _table_columns(db, "weights"))["date"] == "TEXT":
+        await _rebuild_with_unix_dates(
+            db,
+            "weights",
+            """
+            CREATE TABLE weights_new (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                date INTEGER NOT NULL,
+                weight REAL NOT NULL,
+                FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE
+            );
+            """,
+            ("id", "user_id", "date", "weight"),
+            tz,
+        )
+        await db.execute("CREATE INDEX idx_weights_user_date ON weights(user_id, date);")
+
+    # Одна запись на тренировку (user_id, date) — нужна для INSERT ... ON CONFLICT в upsert_workout_log
+    unique_log_index = await db.fetch_one(
+        "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'ux_workout_logs_user_date';"
     )
-    await db.execute("CREATE INDEX IF NOT EXISTS idx_workout_logs_user_date ON workout_logs(user_id, date);")
-    await db.execute("CREATE INDEX IF NOT EXISTS idx_weights_user_date ON weights(user_id, date);")
+    if not unique_log_index:
+        # Из дублей остаётся "done" (выполненная тренировка важнее пропуска), среди равных — последняя запись
+        await db.execute(
+            """
+            DELETE FROM workout_logs
+            WHERE id NOT IN (
+                SELECT id FROM (
+                    SELECT id, ROW_NUMBER() OVER (
+                        PARTITION BY user_id, date ORDER BY status = 'done' DESC, id DESC
+                    ) AS rank
+                    FROM workout_logs
+                )
+                WHERE rank = 1
+            );
+            """
+        )
+        await db.execute("CREATE UNIQUE INDEX ux_workout_logs_user_date ON workout_logs(user_id, date);")
+        await db.execute("DROP INDEX IF EXISTS idx_workout_logs_user_date;")
+
+    # Схема читается один раз; после ALTER TABLE словарь колонок дополняется вручную
+    user_cols = await _table_columns(db, "users")
+    schedule_cols = await _table_columns(db, "workout_schedule")
 
-    if not await _column_exists(db, "users", "week_parity_offset"):
+    if "week_parity_offset" not in user_cols:
         await db.execute("ALTER TABLE users ADD COLUMN week_parity_offset INTEGER;")
+        user_cols["week_parity_offset"] = "INTEGER"
 
-    if not await _column_exists(db, "workout_schedule", "week_type"):
+    if "week_type" not in schedule_cols:
         await db.execute(
             """
             CREATE TABLE workout_schedule_new (
@@ -140,82 +466,65 @@ async def init_db(db: Database) -> None:
         ("activity_level", "TEXT"),
         ("goal", "TEXT"),
     ]:
-        if not await _column_exists(db, "users", col):
+        if col not in user_cols:
             await db.execute(f"ALTER TABLE users ADD COLUMN {col} {dtype};")
+            user_cols[col] = dtype
 
-    await db.execute(
-        """
-        CREATE TABLE IF NOT EXISTS calorie_logs (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER NOT NULL,
-            date TEXT NOT NULL,
-            calories INTEGER NOT NULL,
-            created_at TEXT NOT NULL,
-            FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE
-        );
-        """
-    )
-    await db.execute("CREATE INDEX IF NOT EXISTS idx_calorie_logs_user_date ON calorie_logs(user_id, date);")
-
-    if not await _column_exists(db, "users", "subscription_ends_at"):
+    if "subscription_ends_at" not in user_cols:
         await db.execute("ALTER TABLE users ADD COLUMN subscription_ends_at TEXT;")
+        user_cols["subscription_ends_at"] = "TEXT"
 
-    # Таблица платежей
+    # Цена подписки по умолчанию, если её ещё нет
     await db.execute(
-        """
-        CREATE TABLE IF NOT EXISTS payments (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER NOT NULL,
-            payment_id TEXT NOT NULL UNIQUE,
-            amount REAL NOT NULL,
-            currency TEXT NOT NULL DEFAULT 'RUB',
-            status TEXT NOT NULL,
-            payment_method_id TEXT,
-            created_at TEXT NOT NULL,
-            paid_at TEXT,
-            FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE
-        );
-        """
+        "INSERT OR IGNORE INTO settings (key, value, updated_at) VALUES ('subscription_price_rub', '299', ?);",
+        (datetime.now().isoformat(),),
     )
-    await db.execute("CREATE INDEX IF NOT EXISTS idx_payments_user_id ON payments(user_id);")
-    await db.execute("CREATE INDEX IF NOT EXISTS idx_payments_payment_id ON payments(payment_id);")
-    await db.execute("CREATE INDEX IF NOT EXISTS idx_payments_status ON payments(status);")
 
-    # Таблица рекуррентных подписок
-    await db.execute(
-        """
-        CREATE TABLE IF NOT EXISTS recurring_subscriptions (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER NOT NULL UNIQUE,
-            payment_method_id TEXT NOT NULL,
-            amount REAL NOT NULL,
-            currency TEXT NOT NULL DEFAULT 'RUB',
-            next_payment_date TEXT NOT NULL,
-            is_active INTEGER NOT NULL DEFAULT 1,
-            created_at TEXT NOT NULL,
-            FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE
-        );
-        """
-    )
-    await db.execute("CREATE INDEX IF NOT EXISTS idx_recurring_user_id ON recurring_subscriptions(user_id);")
-    await db.execute("CREATE INDEX IF NOT EXISTS idx_recurring_next_payment ON recurring_subscriptions(next_payment_date);")
 
-    # Таблица настроек (глобальные настройки бота)
-    await db.execute(
-        """
-        CREATE TABLE IF NOT EXISTS settings (
-            key TEXT PRIMARY KEY,
-            value TEXT NOT NULL,
-            updated_at TEXT NOT NULL
-        );
-        """
-    )
-    
-    # Инициализируем цену подписки по умолчанию, если её нет
-    existing_price = await db.fetch_one("SELECT value FROM settings WHERE key = 'subscription_price_rub';")
-    if not existing_price:
-        from datetime import datetime
-        await db.execute(
-            "INSERT INTO settings (key, value, updated_at) VALUES ('subscription_price_rub', '299', ?);",
-            (datetime.now().isoformat(),)
+def _to_unix(value: Any, tz: Optional[tzinfo]) -> Optional[int]:
+    """Старое значение даты (ISO-строка или число) в unix-время; None, если разобрать нельзя."""
+    if isinstance(value, (int, float)):
+        return int(value)
+    if not isinstance(value, str):
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return int(value)
+    try:
+        moment = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    # Даты без смещения записаны в часовом поясе бота (без tz — в локальном времени сервера)
+    if moment.tzinfo is None and tz is not None:
+        moment = moment.replace(tzinfo=tz)
+    return int(moment.timestamp())
+
+
+async def _rebuild_with_unix_dates(
+    db: Database, table: str, create_sql: str, columns: tuple[str, ...], tz: Optional[tzinfo]
+) -> None:
+    """
+    Пересоздать таблицу с колонкой date INTEGER, переведя даты в unix-время.
+    Если какую-то дату разобрать нельзя, миграция прерывается (транзакция откатывается) — строки не теряются.
+    """
+    column_list = ", ".join(columns)
+    date_index = columns.index("date")
+    rows = []
+    unparseable = []
+    for row in await db.fetch_all(f"SELECT {column_list} FROM {table};"):
+        values = list(row)
+        converted = _to_unix(values[date_index], tz)
+        if converted is None:
+            unparseable.append(row["id"])
+            continue
+        values[date_index] = converted
+        rows.append(values)
+    if unparseable:
+        logger.error(f"❌ {table}: {len(unparseable)} строк с неразборчивой датой, id: {unparseable[:20]}")
+        raise RuntimeError(
+            f"Migration of {table} aborted: {len(unparseable)} rows have unparseable dates (ids {unparseable[:20]})"
         )
+    await db.execute(create_sql)
+    await db.insert_many(f"INSERT INTO {table}_new ({column_list})", rows)
+    await db.execute(f"DROP TABLE {table};")
+    await db.execute(f"ALTER TABLE {table}_new RENAME TO {table};")
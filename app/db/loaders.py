@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import asyncio
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from app.db.database import MAX_SQL_PARAMS, Database
+from app.db.models import USER_COLUMNS
+
+
+class UserLoader:
+    """
+    Загрузчик пользователей по tg_id в рамках одного апдейта.
+    Запросы, сделанные в одном проходе цикла событий, собираются в один SELECT ... IN (...),
+    а повторные запросы того же tg_id отвечаются без обращения к БД.
+    """
+
+    def __init__(self, db: Database) -> None:
+        self.db = db
+        self._results: dict[int, asyncio.Future[Optional[dict]]] = {}
+        self._batch: dict[int, asyncio.Future[Optional[dict]]] = {}
+        self._flushes: set[asyncio.Task[None]] = set()
+
+    async def load(self, tg_id: int) -> Optional[dict]:
+        future = self._results.get(tg_id)
+        if future is None:
+            # Ещё не отправленный запрос выполнится уже после записи — его результат годится
+            future = self._batch.get(tg_id)
+            if future is None:
+                future = asyncio.get_running_loop().create_future()
+                if not self._batch:
+                    asyncio.get_running_loop().call_soon(self._schedule_flush)
+                self._batch[tg_id] = future
+            self._results[tg_id] = future
+        user = await future
+        # Копия, чтобы вызывающий код не менял закэшированную строку
+        return dict(user) if user else None
+
+    def clear(self) -> None:
+        """
+        Сбросить загруженное (после записи в users), в том числе ещё не прочитанное:
+        чтение могло начаться до записи, поэтому следующие обращения идут в БД заново.
+        """
+        self._results = {}
+
+    def _schedule_flush(self) -> None:
+        batch, self._batch = self._batch, {}
+        task = asyncio.ensure_future(self._flush(batch))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _flush(self, batch: dict[int, asyncio.Future[Optional[dict]]]) -> None:
+        generation = self.db.user_cache_generation
+        tg_ids = list(batch)
+        try:
+            found: dict[int, dict] = {}
+            for start in range(0, len(tg_ids), MAX_SQL_PARAMS):
+                chunk = tg_ids[start : start + MAX_SQL_PARAMS]
+                placeholders = ", ".join(["?"] * len(chunk))
+                rows = await self.db.fetch_all(f"SELECT {USER_COLUMNS} FROM users WHERE tg_id IN ({placeholders});", chunk)
+                found.update((row["tg_id"], dict(row)) for row in rows)
+        except Exception as exc:
+            for tg_id, future in batch.items():
+                if self._results.get(tg_id) is future:
+                    del self._results[tg_id]
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        # Пока шло чтение, в users писали: ожидающие получат прочитанное, но повторно его не раздаём
+        stale = generation != self.db.user_cache_generation
+        for tg_id, future in batch.items():
+            if stale and self._results.get(tg_id) is future:
+                del self._results[tg_id]
+            if not future.done():
+                future.set_result(found.get(tg_id))
+
+
+_current_user_loader: ContextVar[Optional[UserLoader]] = ContextVar("user_loader", default=None)
+
+
+def current_user_loader(db: Database) -> Optional[UserLoader]:
+    loader = _current_user_loader.get()
+    return loader if loader is not None and loader.db is db else None
+
+
+@contextmanager
+def user_loader_scope(db: Database) -> Iterator[UserLoader]:
+    """Свой UserLoader на время обработки одного апдейта."""
+    loader = UserLoader(db)
+    token = _current_user_loader.set(loader)
+    try:
+        yield loader
+    finally:
+        _current_user_loader.reset(token)
+
+
+def forget_loaded_users() -> None:
+    loader = _current_user_loader.get()
+    if loader is not None:
+        loader.clear()
@@ -1,11 +1,57 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional
+from typing import NamedTuple, Optional
 
 from pydantic import BaseModel, Field, field_validator
 
 
+# Все допустимые времена в каноническом виде "HH:MM" — проверка обычного ввода одним поиском в множестве
+_VALID_TIMES = frozenset(f"{hour:02d}:{minute:02d}" for hour in range(24) for minute in range(60))
+
+
+class UserRow(NamedTuple):
+    """Строка таблицы users для массовых обходов (планировщик)."""
+
+    id: int
+    tg_id: int
+    target_weight: Optional[float]
+    week_parity_offset: Optional[int]
+    created_at: str
+    height_cm: Optional[float]
+    birth_year: Optional[int]
+    gender: Optional[str]
+    activity_level: Optional[str]
+    goal: Optional[str]
+    subscription_ends_at: Optional[str]
+
+
+# Колонки users в порядке UserRow: порядок в SELECT * зависит от того, в какой последовательности шли миграции
+USER_COLUMNS = ", ".join(UserRow._fields)
+
+
+@dataclass(slots=True, frozen=True)
+class ScheduleRow:
+    """Уже провалидированная строка расписания для записи в БД."""
+
+    user_id: int
+    weekday: int
+    time: str
+    week_type: str = "any"
+
+
+@dataclass(slots=True, frozen=True)
+class WorkoutLogRow:
+    """Уже провалидированная запись о тренировке для записи в БД."""
+
+    user_id: int
+    date: datetime
+    status: str
+    duration: Optional[int] = None
+    notes: Optional[str] = None
+
+
 class UserCreate(BaseModel):
     tg_id: int
     target_weight: Optional[float] = None
@@ -29,6 +75,8 @@ class ScheduleCreate(BaseModel):
     @field_validator("time")
     @classmethod
     def validate_time(cls, value: str) -> str:
+        if value in _VALID_TIMES:
+            return value
         if not value:
             raise ValueError("time is required")
         parts = value.split(":")
@@ -51,6 +99,9 @@ class ScheduleCreate(BaseModel):
             raise ValueError("invalid week_type")
         return normalized
 
+    def to_row(self) -> ScheduleRow:
+        return ScheduleRow(self.user_id, self.weekday, self.time, self.week_type)
+
 
 class WeightEntry(BaseModel):
     user_id: int
@@ -89,6 +140,9 @@ class WorkoutLogCreate(BaseModel):
             raise ValueError("duration must be >= 0")
         return value
 
+    def to_row(self) -> WorkoutLogRow:
+        return WorkoutLogRow(self.user_id, self.date, self.status, self.duration, self.notes)
+
 
 class WeekdaysInput(BaseModel):
     days: list[int]
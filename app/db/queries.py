@@ -1,62 +1,222 @@
 from __future__ import annotations
 
+import math
 from datetime import datetime
-from typing import Iterable, Optional
+from functools import lru_cache
+from operator import attrgetter
+from typing import AsyncIterator, Iterable, Optional
 
-from app.db.database import Database
-from app.db.models import ScheduleCreate, WorkoutLogCreate, WeightEntry
+from aiosqlite import Row
+
+from app.db.database import USER_CACHE_SIZE, Database
+from app.db.loaders import current_user_loader, forget_loaded_users
+from app.db.models import USER_COLUMNS, ScheduleRow, UserRow, WorkoutLogRow, WeightEntry
+from app.services.admin_cache import invalidate_admin_caches
+
+
+def _unix(moment: datetime) -> int:
+    """Даты тренировок и взвешиваний хранятся в БД unix-временем."""
+    return int(moment.timestamp())
 
 
 async def create_user(db: Database, tg_id: int, created_at: datetime) -> int:
-    await db.execute(
-        "INSERT OR IGNORE INTO users (tg_id, target_weight, week_parity_offset, created_at) VALUES (?, ?, ?, ?);",
+    # DO UPDATE без изменений нужен, чтобы RETURNING вернул id и для уже существующего пользователя
+    row = await db.execute_returning(
+        """
+        INSERT INTO users (tg_id, target_weight, week_parity_offset, created_at) VALUES (?, ?, ?, ?)
+        ON CONFLICT(tg_id) DO UPDATE SET tg_id = excluded.tg_id
+        RETURNING id;
+        """,
         (tg_id, None, None, created_at.isoformat()),
     )
-    row = await db.fetch_one("SELECT id FROM users WHERE tg_id = ?;", (tg_id,))
+    forget_loaded_users()
+    invalidate_admin_caches()
     if row is None:
         raise RuntimeError("failed to create user")
     return int(row["id"])
 
 
+def _remember_user(db: Database, user: dict, ttl: Optional[float] = None) -> None:
+    db.user_tg_ids[user["id"]] = user["tg_id"]
+    db.user_cache.set(user["tg_id"], user, ttl)
+
+
+def _forget_user(db: Database, user_id: int) -> None:
+    """Сбросить кэши пользователя после записи в users."""
+    db.user_cache_generation += 1
+    tg_id = db.user_tg_ids.get(user_id)
+    if tg_id is not None:
+        db.user_cache.pop(tg_id)
+    forget_loaded_users()
+    invalidate_admin_caches()
+
+
+# Самые частые чтения: одни и те же строки используются в запросах и для прогрева (warm_statement_cache)
+_USER_BY_TG_ID_SQL = f"SELECT {USER_COLUMNS} FROM users WHERE tg_id = ?;"
+_USER_BY_ID_SQL = f"SELECT {USER_COLUMNS} FROM users WHERE id = ?;"
+_SCHEDULE_SQL = "SELECT weekday, time, week_type FROM workout_schedule WHERE user_id = ? ORDER BY weekday, time;"
+_LATEST_WEIGHT_SQL = "SELECT weight, date FROM weights WHERE user_id = ? ORDER BY date DESC LIMIT 1;"
+_WEIGHTS_BETWEEN_SQL = (
+    "SELECT date, weight FROM weights WHERE user_id = ? AND date >= ? AND date <= ? ORDER BY date ASC;"
+)
+# Последнее взвешивание и первое за период — одним запросом (строка помечена kind)
+_STATS_WEIGHTS_SQL = """
+SELECT 'latest' AS kind, weight, date FROM (
+    SELECT weight, date FROM weights WHERE user_id = ? ORDER BY date DESC LIMIT 1
+)
+UNION ALL
+SELECT 'first' AS kind, weight, date FROM (
+    SELECT weight, date FROM weights WHERE user_id = ? AND date >= ? AND date <= ? ORDER BY date ASC LIMIT 1
+);
+"""
+_WORKOUT_STATS_SQL = """
+SELECT
+    COALESCE(SUM(status = 'done'), 0) AS done,
+    COALESCE(SUM(status = 'missed'), 0) AS missed
+FROM workout_logs
+WHERE user_id = ? AND date >= ? AND date <= ?;
+"""
+_CALORIES_FOR_DAY_SQL = (
+    "SELECT COALESCE(SUM(calories), 0) AS total FROM calorie_logs WHERE user_id = ? AND date = ?;"
+)
+_SETTING_SQL = "SELECT value FROM settings WHERE key = ?;"
+
+HOT_QUERIES: tuple[str, ...] = (
+    _USER_BY_TG_ID_SQL,
+    _USER_BY_ID_SQL,
+    _SCHEDULE_SQL,
+    _LATEST_WEIGHT_SQL,
+    _WEIGHTS_BETWEEN_SQL,
+    _STATS_WEIGHTS_SQL,
+    _WORKOUT_STATS_SQL,
+    _CALORIES_FOR_DAY_SQL,
+    _SETTING_SQL,
+)
+
+
+async def warm_statement_cache(db: Database) -> None:
+    """Подготовить частые запросы на всех читателях (после init_db, когда схема уже готова)."""
+    await db.prepare_statements(HOT_QUERIES)
+
+
+_RECENT_USERS_SQL = f"SELECT {USER_COLUMNS} FROM users ORDER BY id DESC LIMIT ?;"
+
+
+async def warm_user_cache(db: Database) -> int:
+    """
+    Загрузить в кэш пользователей последних зарегистрированных (не больше размера кэша),
+    чтобы накопившиеся за время простоя апдейты после рестарта не шли в БД по одному.
+    Прогретые записи не устаревают по TTL: все записи в users идут через queries и сбрасывают
+    запись (_forget_user), так что строка живёт, пока её не изменят или не вытеснит LRU.
+    """
+    rows = await db.fetch_all(_RECENT_USERS_SQL, (USER_CACHE_SIZE,))
+    # Самые новые кладём последними — они дольше всех проживут в LRU
+    for row in reversed(rows):
+        _remember_user(db, dict(row), ttl=math.inf)
+    return len(rows)
+
+
 async def get_user_by_tg_id(db: Database, tg_id: int) -> Optional[dict]:
-    row = await db.fetch_one("SELECT * FROM users WHERE tg_id = ?;", (tg_id,))
-    return dict(row) if row else None
+    cached = db.user_cache.get(tg_id)
+    if cached is not None:
+        return dict(cached)
+    generation = db.user_cache_generation
+    # Внутри апдейта — через UserLoader (один запрос на все обращения к пользователю)
+    loader = current_user_loader(db)
+    if loader is not None:
+        user = await loader.load(tg_id)
+    else:
+        row = await db.fetch_one(_USER_BY_TG_ID_SQL, (tg_id,))
+        user = dict(row) if row else None
+    # Отсутствующих не кэшируем: пользователь может появиться после /start.
+    # Если пока шло чтение, в users писали, строка может быть старой — её не кэшируем
+    if user is not None and generation == db.user_cache_generation:
+        _remember_user(db, dict(user))
+    return user
 
 
 async def update_target_weight(db: Database, user_id: int, target_weight: float) -> None:
     await db.execute("UPDATE users SET target_weight = ? WHERE id = ?;", (target_weight, user_id))
+    _forget_user(db, user_id)
 
 
 async def update_week_parity_offset(db: Database, user_id: int, offset: int) -> None:
     await db.execute("UPDATE users SET week_parity_offset = ? WHERE id = ?;", (offset, user_id))
+    _forget_user(db, user_id)
 
 
-async def list_users(db: Database) -> list[dict]:
-    rows = await db.fetch_all("SELECT * FROM users;")
-    return [dict(row) for row in rows]
+_LIST_USERS_SQL = f"SELECT {USER_COLUMNS} FROM users;"
+
 
+async def list_users(db: Database) -> list[UserRow]:
+    rows = await db.fetch_all(_LIST_USERS_SQL)
+    return list(map(UserRow._make, rows))
 
-async def replace_workout_schedule(db: Database, user_id: int, schedules: Iterable[ScheduleCreate]) -> None:
-    await db.execute("DELETE FROM workout_schedule WHERE user_id = ?;", (user_id,))
-    payload = [(s.user_id, s.weekday, s.time, s.week_type) for s in schedules]
-    if payload:
-        await db.execute_many(
-            "INSERT OR IGNORE INTO workout_schedule (user_id, weekday, time, week_type) VALUES (?, ?, ?, ?);",
-            payload,
+
+async def iter_user_tg_ids(db: Database, after_id: int = 0, page_size: int = 500) -> AsyncIterator[list[Row]]:
+    """
+    Строки (id, tg_id) всех пользователей с id > after_id страницами (по возрастанию id).
+    Читатель не удерживается между страницами; id последней обработанной строки годится как курсор для продолжения.
+    """
+    last_id = after_id
+    while True:
+        rows = await db.fetch_all(
+            "SELECT id, tg_id FROM users WHERE id > ? ORDER BY id LIMIT ?;",
+            (last_id, page_size),
+        )
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1]["id"]
+
+
+_schedule_params = attrgetter("user_id", "weekday", "time", "week_type")
+_INSERT_SCHEDULE_SQL = "INSERT OR IGNORE INTO workout_schedule (user_id, weekday, time, week_type)"
+
+
+async def replace_week_type_schedule(
+    db: Database, user_id: int, week_type: str, schedules: Iterable[ScheduleRow]
+) -> list[dict]:
+    """
+    Заменить расписание одного типа недель в одной транзакции: удаляются только исчезнувшие записи,
+    вставляются только новые (совпадающие строки не трогаются).
+    Возвращает итоговое расписание пользователя (как get_workout_schedule) — повторно читать его не нужно.
+    """
+    new = {(weekday, time) for _, weekday, time, _ in map(_schedule_params, schedules)}
+    async with db.transaction():
+        current = await get_workout_schedule(db, user_id)
+        kept = [entry for entry in current if entry["week_type"] != week_type]
+        replaced = {(entry["weekday"], entry["time"]) for entry in current if entry["week_type"] == week_type}
+        stale = replaced - new
+        if stale:
+            placeholders = ", ".join(["(?, ?)"] * len(stale))
+            await db.execute(
+                f"DELETE FROM workout_schedule WHERE user_id = ? AND week_type = ? AND (weekday, time) IN (VALUES {placeholders});",
+                [user_id, week_type, *(param for key in stale for param in key)],
+            )
+        await db.insert_many(
+            _INSERT_SCHEDULE_SQL, [(user_id, weekday, time, week_type) for weekday, time in new - replaced]
         )
+    kept.extend({"weekday": weekday, "time": time, "week_type": week_type} for weekday, time in new)
+    kept.sort(key=lambda entry: (entry["weekday"], entry["time"]))
+    return kept
 
 
-async def add_workout_schedule(db: Database, schedule: ScheduleCreate) -> None:
-    await db.execute(
-        "INSERT OR IGNORE INTO workout_schedule (user_id, weekday, time, week_type) VALUES (?, ?, ?, ?);",
-        (schedule.user_id, schedule.weekday, schedule.time, schedule.week_type),
-    )
+async def add_workout_schedules(db: Database, schedules: Iterable[ScheduleRow]) -> None:
+    """Добавить записи расписания одной вставкой (уже существующие пропускаются)."""
+    await db.insert_many(_INSERT_SCHEDULE_SQL, list(map(_schedule_params, schedules)))
 
 
 async def get_workout_schedule(db: Database, user_id: int) -> list[dict]:
+    rows = await db.fetch_all(_SCHEDULE_SQL, (user_id,))
+    return [dict(row) for row in rows]
+
+
+async def get_workout_schedule_by_type(db: Database, user_id: int, week_type: str) -> list[dict]:
+    """Расписание одного типа недель (фильтр по week_type — в SQL)."""
     rows = await db.fetch_all(
-        "SELECT weekday, time, week_type FROM workout_schedule WHERE user_id = ? ORDER BY weekday, time;",
-        (user_id,),
+        "SELECT weekday, time, week_type FROM workout_schedule WHERE user_id = ? AND week_type = ? ORDER BY weekday, time;",
+        (user_id, week_type),
     )
     return [dict(row) for row in rows]
 
@@ -64,91 +224,95 @@ async def get_workout_schedule(db: Database, user_id: int) -> list[dict]:
 async def add_weight_entry(db: Database, entry: WeightEntry) -> None:
     await db.execute(
         "INSERT INTO weights (user_id, date, weight) VALUES (?, ?, ?);",
-        (entry.user_id, entry.date.isoformat(), entry.weight),
+        (entry.user_id, _unix(entry.date), entry.weight),
     )
 
 
-async def get_latest_weight(db: Database, user_id: int) -> Optional[dict]:
-    row = await db.fetch_one(
-        "SELECT * FROM weights WHERE user_id = ? ORDER BY date DESC LIMIT 1;",
-        (user_id,),
+async def add_weight_entries_many(db: Database, entries: Iterable[WeightEntry]) -> None:
+    """Пакетная вставка взвешиваний: один multi-row INSERT в одной транзакции."""
+    await db.insert_many(
+        "INSERT INTO weights (user_id, date, weight)",
+        [(entry.user_id, _unix(entry.date), entry.weight) for entry in entries],
     )
-    return dict(row) if row else None
 
 
-async def get_weights_between(db: Database, user_id: int, start: datetime, end: datetime) -> list[dict]:
-    rows = await db.fetch_all(
-        "SELECT * FROM weights WHERE user_id = ? AND date >= ? AND date <= ? ORDER BY date ASC;",
-        (user_id, start.isoformat(), end.isoformat()),
-    )
-    return [dict(row) for row in rows]
+async def get_latest_weight(db: Database, user_id: int) -> Optional[Row]:
+    return await db.fetch_one(_LATEST_WEIGHT_SQL, (user_id,))
 
 
-async def get_first_weight_between(db: Database, user_id: int, start: datetime, end: datetime) -> Optional[dict]:
-    row = await db.fetch_one(
-        "SELECT * FROM weights WHERE user_id = ? AND date >= ? AND date <= ? ORDER BY date ASC LIMIT 1;",
-        (user_id, start.isoformat(), end.isoformat()),
+async def get_weights_between(db: Database, user_id: int, start: datetime, end: datetime) -> list[Row]:
+    return await db.fetch_all(
+        _WEIGHTS_BETWEEN_SQL,
+        (user_id, _unix(start), _unix(end)),
     )
-    return dict(row) if row else None
 
 
-async def get_last_weight_between(db: Database, user_id: int, start: datetime, end: datetime) -> Optional[dict]:
-    row = await db.fetch_one(
-        "SELECT * FROM weights WHERE user_id = ? AND date >= ? AND date <= ? ORDER BY date DESC LIMIT 1;",
-        (user_id, start.isoformat(), end.isoformat()),
-    )
-    return dict(row) if row else None
+async def get_stats_weights(
+    db: Database, user_id: int, start: datetime, end: datetime
+) -> tuple[Optional[Row], Optional[Row]]:
+    """(последнее взвешивание, первое взвешивание за период) за один запрос."""
+    rows = await db.fetch_all(_STATS_WEIGHTS_SQL, (user_id, user_id, _unix(start), _unix(end)))
+    by_kind = {row["kind"]: row for row in rows}
+    return by_kind.get("latest"), by_kind.get("first")
 
 
-async def upsert_workout_log(db: Database, log: WorkoutLogCreate) -> None:
-    existing = await db.fetch_one(
-        "SELECT id FROM workout_logs WHERE user_id = ? AND date = ?;",
-        (log.user_id, log.date.isoformat()),
-    )
-    if existing:
-        await db.execute(
-            "UPDATE workout_logs SET status = ?, duration = ?, notes = ? WHERE id = ?;",
-            (log.status, log.duration, log.notes, int(existing["id"])),
-        )
+_UPSERT_WORKOUT_LOG_SQL = """
+INSERT INTO workout_logs (user_id, date, status, duration, notes) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT(user_id, date) DO UPDATE SET
+    status = excluded.status, duration = excluded.duration, notes = excluded.notes;
+"""
+
+
+def _workout_log_params(log: WorkoutLogRow) -> tuple:
+    return (log.user_id, _unix(log.date), log.status, log.duration, log.notes)
+
+
+async def upsert_workout_log(db: Database, log: WorkoutLogRow) -> None:
+    await db.execute(_UPSERT_WORKOUT_LOG_SQL, _workout_log_params(log))
+
+
+async def upsert_workout_logs_many(db: Database, logs: Iterable[WorkoutLogRow]) -> None:
+    """Пакетный upsert: один executemany в одной транзакции."""
+    payload = list(map(_workout_log_params, logs))
+    if not payload:
         return
-    await db.execute(
-        "INSERT INTO workout_logs (user_id, date, status, duration, notes) VALUES (?, ?, ?, ?, ?);",
-        (log.user_id, log.date.isoformat(), log.status, log.duration, log.notes),
-    )
+    await db.execute_many_commit(_UPSERT_WORKOUT_LOG_SQL, payload)
 
 
-async def workout_log_exists(db: Database, user_id: int, workout_at: datetime) -> bool:
-    row = await db.fetch_one(
-        "SELECT 1 FROM workout_logs WHERE user_id = ? AND date = ?;",
-        (user_id, workout_at.isoformat()),
+async def insert_workout_log_if_absent(db: Database, log: WorkoutLogRow) -> bool:
+    """Записать тренировку, только если по ней ещё нет записи. True — запись создана."""
+    row = await db.execute_returning(
+        """
+        INSERT INTO workout_logs (user_id, date, status, duration, notes) VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(user_id, date) DO NOTHING RETURNING id;
+        """,
+        _workout_log_params(log),
     )
     return row is not None
 
 
 async def get_workout_stats(db: Database, user_id: int, start: datetime, end: datetime) -> dict:
-    rows = await db.fetch_all(
+    row = await db.fetch_one(_WORKOUT_STATS_SQL, (user_id, _unix(start), _unix(end)))
+    return {"done": int(row["done"]), "missed": int(row["missed"])}
+
+
+async def get_workout_logs_between(db: Database, user_id: int, start: datetime, end: datetime) -> list[Row]:
+    return await db.fetch_all(
         """
-        SELECT status, COUNT(*) as cnt
-        FROM workout_logs
-        WHERE user_id = ? AND date >= ? AND date <= ?
-        GROUP BY status;
+        SELECT id, user_id, date, status, duration, notes FROM workout_logs
+        WHERE user_id = ? AND date >= ? AND date <= ? ORDER BY date ASC;
         """,
-        (user_id, start.isoformat(), end.isoformat()),
+        (user_id, _unix(start), _unix(end)),
     )
-    stats = {"done": 0, "missed": 0}
-    for row in rows:
-        status = row["status"]
-        if status in stats:
-            stats[status] = int(row["cnt"])
-    return stats
 
 
-async def get_workout_logs_between(db: Database, user_id: int, start: datetime, end: datetime) -> list[dict]:
-    rows = await db.fetch_all(
-        "SELECT * FROM workout_logs WHERE user_id = ? AND date >= ? AND date <= ? ORDER BY date ASC;",
-        (user_id, start.isoformat(), end.isoformat()),
-    )
-    return [dict(row) for row in rows]
+_CALORIE_PARAM_COLUMNS = ("height_cm", "birth_year", "gender", "activity_level", "goal", "target_weight")
+
+
+@lru_cache(maxsize=64)
+def _users_update_sql(columns: tuple[str, ...]) -> str:
+    # Один и тот же набор полей — один и тот же текст SQL (и попадание в кэш выражений sqlite3)
+    return f"UPDATE users SET {', '.join(f'{column} = ?' for column in columns)} WHERE id = ?;"
 
 
 async def update_user_calorie_params(
@@ -163,32 +327,14 @@ async def update_user_calorie_params(
     target_weight: float | None = None,
 ) -> None:
     """Обновляет параметры для расчёта калорий и цели."""
-    updates, params = [], []
-    if height_cm is not None:
-        updates.append("height_cm = ?")
-        params.append(height_cm)
-    if birth_year is not None:
-        updates.append("birth_year = ?")
-        params.append(birth_year)
-    if gender is not None:
-        updates.append("gender = ?")
-        params.append(gender)
-    if activity_level is not None:
-        updates.append("activity_level = ?")
-        params.append(activity_level)
-    if goal is not None:
-        updates.append("goal = ?")
-        params.append(goal)
-    if target_weight is not None:
-        updates.append("target_weight = ?")
-        params.append(target_weight)
-    if not updates:
+    values = (height_cm, birth_year, gender, activity_level, goal, target_weight)
+    columns = tuple(column for column, value in zip(_CALORIE_PARAM_COLUMNS, values) if value is not None)
+    if not columns:
         return
+    params = [value for value in values if value is not None]
     params.append(user_id)
-    await db.execute(
-        f"UPDATE users SET {', '.join(updates)} WHERE id = ?;",
-        params,
-    )
+    await db.execute(_users_update_sql(columns), params)
+    _forget_user(db, user_id)
 
 
 async def add_calorie_log(
@@ -205,24 +351,58 @@ async def add_calorie_log(
     )
 
 
+async def add_calorie_logs_many(
+    db: Database,
+    user_id: int,
+    entries: Iterable[tuple[str, int]],
+    created_at: datetime,
+) -> None:
+    """Пакетная вставка записей о калориях: entries — пары (день YYYY-MM-DD, калории)."""
+    created_iso = created_at.isoformat()
+    await db.insert_many(
+        "INSERT INTO calorie_logs (user_id, date, calories, created_at)",
+        [(user_id, date_day, calories, created_iso) for date_day, calories in entries],
+    )
+
+
+async def add_calorie_log_and_get_total(
+    db: Database,
+    user_id: int,
+    date_day: str,
+    calories: int,
+    created_at: datetime,
+) -> int:
+    """Добавляет запись о калориях и возвращает сумму за день — в одной транзакции на писателе."""
+    async with db.transaction():
+        await add_calorie_log(db, user_id, date_day, calories, created_at)
+        return await get_calories_sum_for_day(db, user_id, date_day)
+
+
 async def get_calories_sum_for_day(db: Database, user_id: int, date_day: str) -> int:
     """Сумма калорий за день."""
-    row = await db.fetch_one(
-        "SELECT COALESCE(SUM(calories), 0) AS total FROM calorie_logs WHERE user_id = ? AND date = ?;",
-        (user_id, date_day),
-    )
+    row = await db.fetch_one(_CALORIES_FOR_DAY_SQL, (user_id, date_day))
     return int(row["total"]) if row else 0
 
 
 async def get_user_by_id(db: Database, user_id: int) -> Optional[dict]:
     """Пользователь по id."""
-    row = await db.fetch_one("SELECT * FROM users WHERE id = ?;", (user_id,))
-    return dict(row) if row else None
+    tg_id = db.user_tg_ids.get(user_id)
+    cached = db.user_cache.get(tg_id) if tg_id is not None else None
+    if cached is not None:
+        return dict(cached)
+    generation = db.user_cache_generation
+    row = await db.fetch_one(_USER_BY_ID_SQL, (user_id,))
+    if row is None:
+        return None
+    if generation == db.user_cache_generation:
+        _remember_user(db, dict(row))
+    return dict(row)
 
 
 async def set_subscription_ends_at(db: Database, user_id: int, date_iso: str) -> None:
     """Установить дату окончания подписки (YYYY-MM-DD)."""
     await db.execute("UPDATE users SET subscription_ends_at = ? WHERE id = ?;", (date_iso, user_id))
+    _forget_user(db, user_id)
 
 
 async def create_payment(
@@ -268,18 +448,18 @@ async def update_payment_status(
     )
 
 
-async def get_payment_by_id(db: Database, payment_id: str) -> Optional[dict]:
+async def get_payment_by_id(db: Database, payment_id: str) -> Optional[Row]:
     """Получить платеж по payment_id."""
-    row = await db.fetch_one("SELECT * FROM payments WHERE payment_id = ?;", (payment_id,))
-    return dict(row) if row else None
+    return await db.fetch_one(
+        "SELECT payment_id, user_id, amount, status FROM payments WHERE payment_id = ?;", (payment_id,)
+    )
 
 
-async def get_pending_payments(db: Database) -> list[dict]:
+async def get_pending_payments(db: Database) -> list[Row]:
     """Получить все платежи со статусом pending или waiting_for_capture."""
-    rows = await db.fetch_all(
-        "SELECT * FROM payments WHERE status IN ('pending', 'waiting_for_capture');"
+    return await db.fetch_all(
+        "SELECT payment_id, amount FROM payments WHERE status IN ('pending', 'waiting_for_capture');"
     )
-    return [dict(row) for row in rows]
 
 
 
@@ -311,13 +491,15 @@ async def create_recurring_subscription(
     )
 
 
-async def get_recurring_subscription(db: Database, user_id: int) -> Optional[dict]:
+async def get_recurring_subscription(db: Database, user_id: int) -> Optional[Row]:
     """Получить активную рекуррентную подписку пользователя."""
-    row = await db.fetch_one(
-        "SELECT * FROM recurring_subscriptions WHERE user_id = ? AND is_active = 1;",
+    return await db.fetch_one(
+        """
+        SELECT id, user_id, payment_method_id, amount, currency, next_payment_date, is_active, created_at
+        FROM recurring_subscriptions WHERE user_id = ? AND is_active = 1;
+        """,
         (user_id,),
     )
-    return dict(row) if row else None
 
 
 async def update_recurring_subscription_next_payment(
@@ -340,40 +522,65 @@ async def deactivate_recurring_subscription(db: Database, user_id: int) -> None:
     )
 
 
-async def get_recurring_subscriptions_due(db: Database, date_iso: str) -> list[dict]:
-    """Получить рекуррентные подписки, у которых наступила дата следующего платежа."""
-    rows = await db.fetch_all(
-        "SELECT * FROM recurring_subscriptions WHERE is_active = 1 AND next_payment_date <= ?;",
+async def get_recurring_subscriptions_due(db: Database, date_iso: str) -> list[Row]:
+    """Рекуррентные подписки, у которых наступила дата следующего платежа, вместе с tg_id владельца."""
+    return await db.fetch_all(
+        """
+        SELECT rs.user_id, rs.amount, u.tg_id
+        FROM recurring_subscriptions rs
+        JOIN users u ON u.id = rs.user_id
+        WHERE rs.is_active = 1 AND rs.next_payment_date <= ?;
+        """,
         (date_iso,),
     )
-    return [dict(row) for row in rows]
 
 
 async def get_setting(db: Database, key: str) -> Optional[str]:
     """Получить значение настройки по ключу."""
-    row = await db.fetch_one("SELECT value FROM settings WHERE key = ?;", (key,))
-    return row["value"] if row else None
+    cached = db.settings_cache.get(key)
+    if cached is not None:
+        return cached
+    row = await db.fetch_one(_SETTING_SQL, (key,))
+    if row is None:
+        return None
+    db.settings_cache.set(key, row["value"])
+    return row["value"]
 
 
 async def set_setting(db: Database, key: str, value: str, updated_at: datetime) -> None:
     """Установить значение настройки."""
     await db.execute(
-        "INSERT OR REPLACE INTO settings (key, value, updated_at) VALUES (?, ?, ?);",
+        """
+        INSERT INTO settings (key, value, updated_at) VALUES (?, ?, ?)
+        ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at;
+        """,
         (key, value, updated_at.isoformat()),
     )
+    # Настроек единицы — проще сбросить всё, включая разобранные значения
+    db.settings_cache.clear()
+
+
+_PRICE_CACHE_KEY = ("subscription_price_rub", float)
 
 
 async def get_subscription_price(db: Database) -> float:
     """Получить цену подписки из настроек (по умолчанию 299)."""
+    cached = db.settings_cache.get(_PRICE_CACHE_KEY)
+    if cached is not None:
+        return cached
+    price = 299.0  # Значение по умолчанию
     price_str = await get_setting(db, "subscription_price_rub")
     if price_str:
         try:
-            return float(price_str)
+            price = float(price_str)
         except (ValueError, TypeError):
             pass
-    return 299.0  # Значение по умолчанию
+    db.settings_cache.set(_PRICE_CACHE_KEY, price)
+    return price
 
 
 async def set_subscription_price(db: Database, price: float, updated_at: datetime) -> None:
     """Установить цену подписки."""
     await set_setting(db, "subscription_price_rub", str(price), updated_at)
+    # Сразу кладём новое значение, чтобы следующий показ цены не ходил в БД
+    db.settings_cache.set(_PRICE_CACHE_KEY, float(price))
@@ -1,37 +1,48 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 from datetime import datetime, timedelta
 from io import BytesIO
+from time import monotonic
 from zoneinfo import ZoneInfo
-from typing import Optional
+from typing import AsyncIterable, Optional, Sequence
 
-from aiogram import Router, F
+from aiogram import Bot, Router, F
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
+from aiogram.exceptions import TelegramBadRequest, TelegramRetryAfter
 from aiogram.types import CallbackQuery, Message, BufferedInputFile
 from openpyxl import Workbook
 from openpyxl.styles import Font, Alignment, PatternFill
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.utils import get_column_letter
 
 from app.config import Config
 from app.db.database import Database
 from app.db import queries
 from app.services.access import get_subscription_price_rub
-from app.utils.keyboards import admin_panel_kb, main_menu_kb
+from app.services.admin_cache import get_admin_text, set_admin_text
+from app.utils.keyboards import admin_panel_markup, main_menu_markup
+from app.utils.parsing import WEEKDAYS_RU
 
 logger = logging.getLogger(__name__)
 
 router = Router()
 
 
-def is_admin(user_id: int, config: Config) -> bool:
-    """Проверяет, является ли пользователь админом"""
-    return user_id in config.admin_ids
+async def _edit_admin_text(message: Message, text: str) -> None:
+    """Показать текст с клавиатурой админ-панели (повторное нажатие с тем же текстом — не ошибка)."""
+    try:
+        await message.edit_text(text, reply_markup=admin_panel_markup())
+    except TelegramBadRequest as e:
+        if "message is not modified" not in str(e):
+            raise
 
 
 class BroadcastStates(StatesGroup):
     waiting_message = State()
+    sending = State()  # Рассылка идёт: новый ввод не принимается
 
 
 class PriceStates(StatesGroup):
@@ -41,13 +52,13 @@ class PriceStates(StatesGroup):
 @router.callback_query(F.data == "menu:admin")
 async def admin_panel_handler(
     query: CallbackQuery,
-    config: Config,
+    is_admin: bool = False,
 ) -> None:
     """Обработчик кнопки админ-панели"""
     if query.from_user is None or query.message is None:
         return
     
-    if not is_admin(query.from_user.id, config):
+    if not is_admin:
         await query.answer("❌ У вас нет доступа к админ-панели", show_alert=True)
         return
     
@@ -55,7 +66,7 @@ async def admin_panel_handler(
     await query.message.edit_text(
         "🔐 <b>Админ-панель</b>\n\n"
         "Выберите действие:",
-        reply_markup=admin_panel_kb().as_markup(),
+        reply_markup=admin_panel_markup(),
     )
 
 
@@ -77,89 +88,74 @@ async def admin_back_handler(
     await query.answer()
     await query.message.edit_text(
         "👋 <b>Главное меню</b>",
-        reply_markup=main_menu_kb(config.admin_ids, query.from_user.id).as_markup(),
+        reply_markup=main_menu_markup(config.admin_ids, query.from_user.id),
     )
 
 
 @router.callback_query(F.data == "admin:stats")
 async def admin_stats_handler(
     query: CallbackQuery,
-    config: Config,
     db: Database,
     tz: ZoneInfo,
+    is_admin: bool = False,
 ) -> None:
     """Подробная статистика бота"""
     if query.from_user is None or query.message is None:
         return
     
-    if not is_admin(query.from_user.id, config):
+    if not is_admin:
         await query.answer("❌ У вас нет доступа", show_alert=True)
         return
     
     await query.answer("📊 Загрузка статистики...")
+
+    cached = get_admin_text("stats")
+    if cached is not None:
+        await _edit_admin_text(query.message, cached)
+        return
     
     try:
-        # Получаем статистику
-        users = await db.fetch_all("SELECT * FROM users")
-        total_users = len(users)
-        
-        # Активные пользователи (за последние 30 дней)
         thirty_days_ago = datetime.now(tz) - timedelta(days=30)
-        active_users = await db.fetch_all(
-            "SELECT DISTINCT user_id FROM workout_logs WHERE date >= ?",
-            (thirty_days_ago.isoformat(),)
-        )
-        active_count = len(active_users)
-        
-        # Новые пользователи за последние 7 дней
         seven_days_ago = datetime.now(tz) - timedelta(days=7)
-        new_users = await db.fetch_all(
-            "SELECT * FROM users WHERE created_at >= ?",
-            (seven_days_ago.isoformat(),)
-        )
-        new_count = len(new_users)
-        
-        # Статистика тренировок
-        total_workouts = await db.fetch_one(
-            "SELECT COUNT(*) as count FROM workout_logs"
-        )
-        total_workouts_count = total_workouts["count"] if total_workouts else 0
-        
-        done_workouts = await db.fetch_one(
-            "SELECT COUNT(*) as count FROM workout_logs WHERE status = 'done'"
-        )
-        done_count = done_workouts["count"] if done_workouts else 0
-        
-        missed_workouts = await db.fetch_one(
-            "SELECT COUNT(*) as count FROM workout_logs WHERE status = 'missed'"
-        )
-        missed_count = missed_workouts["count"] if missed_workouts else 0
-        
-        # Статистика веса
-        total_weight_entries = await db.fetch_one(
-            "SELECT COUNT(*) as count FROM weights"
-        )
-        weight_count = total_weight_entries["count"] if total_weight_entries else 0
-        
-        # Пользователи с расписанием
-        users_with_schedule = await db.fetch_one(
-            "SELECT COUNT(DISTINCT user_id) as count FROM workout_schedule"
-        )
-        schedule_count = users_with_schedule["count"] if users_with_schedule else 0
-        
-        # Статистика за последние 7 дней
-        workouts_last_7_days = await db.fetch_one(
-            "SELECT COUNT(*) as count FROM workout_logs WHERE date >= ?",
-            (seven_days_ago.isoformat(),)
-        )
-        workouts_7d = workouts_last_7_days["count"] if workouts_last_7_days else 0
-        
-        # Статистика за последние 30 дней
-        workouts_last_30_days = await db.fetch_one(
-            "SELECT COUNT(*) as count FROM workout_logs WHERE date >= ?",
-            (thirty_days_ago.isoformat(),)
+        since_30d = int(thirty_days_ago.timestamp())
+        since_7d = int(seven_days_ago.timestamp())
+
+        # Независимые агрегаты — параллельно через пул читателей
+        users_stats, workouts_stats, weights_stats, schedule_stats = await asyncio.gather(
+            # Всего пользователей и новых за последние 7 дней
+            db.fetch_one(
+                "SELECT COUNT(*) AS total, COALESCE(SUM(created_at >= ?), 0) AS new FROM users;",
+                (seven_days_ago.isoformat(),),
+            ),
+            # Тренировки: итоги по статусам, за 7/30 дней и активные пользователи (30 дней) — один проход
+            db.fetch_one(
+                """
+                SELECT
+                    COUNT(*) AS total,
+                    COALESCE(SUM(status = 'done'), 0) AS done,
+                    COALESCE(SUM(status = 'missed'), 0) AS missed,
+                    COALESCE(SUM(date >= ?), 0) AS last_7d,
+                    COALESCE(SUM(date >= ?), 0) AS last_30d,
+                    COUNT(DISTINCT CASE WHEN date >= ? THEN user_id END) AS active_users
+                FROM workout_logs;
+                """,
+                (since_7d, since_30d, since_30d),
+            ),
+            db.fetch_one("SELECT COUNT(*) AS count FROM weights;"),
+            # Пользователи с расписанием
+            # (через DISTINCT в подзапросе — по автоиндексу UNIQUE, без временного B-дерева)
+            db.fetch_one("SELECT COUNT(*) AS count FROM (SELECT DISTINCT user_id FROM workout_schedule);"),
         )
-        workouts_30d = workouts_last_30_days["count"] if workouts_last_30_days else 0
+        total_users = users_stats["total"]
+        new_count = users_stats["new"]
+        active_count = workouts_stats["active_users"]
+        total_workouts_count = workouts_stats["total"]
+        done_count = workouts_stats["done"]
+        missed_count = workouts_stats["missed"]
+        workouts_7d = workouts_stats["last_7d"]
+        workouts_30d = workouts_stats["last_30d"]
+        weight_count = weights_stats["count"]
+        schedule_count = schedule_stats["count"]
         
         # Процент выполнения тренировок
         completion_rate = (done_count / total_workouts_count * 100) if total_workouts_count > 0 else 0
@@ -181,183 +177,192 @@ async def admin_stats_handler(
             f"• Всего записей: <b>{weight_count}</b>\n\n"
             f"📅 <b>Обновлено:</b> {datetime.now(tz).strftime('%d.%m.%Y %H:%M')}"
         )
+        set_admin_text("stats", stats_text)
         
-        await query.message.edit_text(
-            stats_text,
-            reply_markup=admin_panel_kb().as_markup(),
-        )
+        await _edit_admin_text(query.message, stats_text)
     except Exception as e:
         logger.error(f"Ошибка при получении статистики: {e}", exc_info=True)
         await query.message.edit_text(
             "❌ <b>Ошибка при получении статистики</b>\n\n"
             f"Детали: {str(e)}",
-            reply_markup=admin_panel_kb().as_markup(),
+            reply_markup=admin_panel_markup(),
         )
 
 
+_HEADER_FILL = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+_HEADER_FONT = Font(bold=True, color="FFFFFF")
+_HEADER_ALIGNMENT = Alignment(horizontal="center")
+# Строк на одну передачу в поток при записи листа
+_EXPORT_APPEND_BATCH = 1000
+
+
+async def _max_lengths(db: Database, query: str) -> list[int]:
+    """Максимальная длина значений по колонкам листа — одним агрегатом в SQL (query возвращает одну строку)."""
+    row = await db.fetch_one(query)
+    return [int(length or 0) for length in row]
+
+
+async def _write_export_sheet(
+    wb: Workbook,
+    title: str,
+    headers: Sequence[str],
+    lengths: Sequence[int],
+    rows: AsyncIterable[Sequence],
+) -> None:
+    """
+    Лист выгрузки в write-only книге: строки пишутся по мере чтения из БД.
+    Ширины колонок нужно задать до первой строки, поэтому длины значений считаются заранее (_max_lengths).
+    """
+    ws = wb.create_sheet(title)
+    for idx, (header, length) in enumerate(zip(headers, lengths), 1):
+        ws.column_dimensions[get_column_letter(idx)].width = min(max(len(header), length) + 2, 50)
+
+    header_cells = []
+    for header in headers:
+        cell = WriteOnlyCell(ws, value=header)
+        cell.fill = _HEADER_FILL
+        cell.font = _HEADER_FONT
+        cell.alignment = _HEADER_ALIGNMENT
+        header_cells.append(cell)
+    ws.append(header_cells)
+    # Сериализация строк в XML — CPU-работа: пачками в отдельном потоке, чтобы не блокировать цикл событий
+    batch: list[Sequence] = []
+    async for row in rows:
+        batch.append(row)
+        if len(batch) >= _EXPORT_APPEND_BATCH:
+            await asyncio.to_thread(_append_rows, ws, batch)
+            batch = []
+    if batch:
+        await asyncio.to_thread(_append_rows, ws, batch)
+
+
+def _append_rows(ws, rows: Sequence[Sequence]) -> None:
+    for row in rows:
+        ws.append(row)
+
+
+def _workbook_bytes(wb: Workbook) -> bytes:
+    buffer = BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+
 @router.callback_query(F.data == "admin:export")
 async def admin_export_handler(
     query: CallbackQuery,
-    config: Config,
     db: Database,
     tz: ZoneInfo,
+    is_admin: bool = False,
 ) -> None:
     """Выгрузка данных в Excel"""
     if query.from_user is None or query.message is None:
         return
     
-    if not is_admin(query.from_user.id, config):
+    if not is_admin:
         await query.answer("❌ У вас нет доступа", show_alert=True)
         return
     
     await query.answer("📥 Создание Excel файла...")
     
     try:
-        wb = Workbook()
-        
-        # Удаляем дефолтный лист
-        wb.remove(wb.active)
+        # write-only: строки сразу сериализуются, объекты ячеек не копятся в памяти
+        wb = Workbook(write_only=True)
         
         # Лист 1: Пользователи
-        ws_users = wb.create_sheet("Пользователи")
-        ws_users.append(["ID", "Telegram ID", "Целевой вес", "Создан", "Смещение недели"])
-        users = await db.fetch_all("SELECT * FROM users")
-        for user_row in users:
-            user = dict(user_row)
-            ws_users.append([
-                user["id"],
-                user["tg_id"],
-                user.get("target_weight") or "",
-                user.get("created_at") or "",
-                user.get("week_parity_offset") or 0,
-            ])
-        
-        # Стилизация заголовков
-        header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-        header_font = Font(bold=True, color="FFFFFF")
-        for cell in ws_users[1]:
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = Alignment(horizontal="center")
-        
-        # Автоширина колонок
-        for column in ws_users.columns:
-            max_length = 0
-            column_letter = get_column_letter(column[0].column)
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            ws_users.column_dimensions[column_letter].width = min(max_length + 2, 50)
-        
-        # Лист 2: Тренировки
-        ws_workouts = wb.create_sheet("Тренировки")
-        ws_workouts.append(["ID", "User ID", "Дата", "Статус", "Длительность", "Заметки"])
-        workouts = await db.fetch_all("SELECT * FROM workout_logs ORDER BY date DESC")
-        for workout_row in workouts:
-            workout = dict(workout_row)
-            ws_workouts.append([
-                workout["id"],
-                workout["user_id"],
-                workout.get("date") or "",
-                workout.get("status") or "",
-                workout.get("duration") or "",
-                workout.get("notes") or "",
-            ])
-        
-        # Стилизация заголовков
-        for cell in ws_workouts[1]:
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = Alignment(horizontal="center")
+        await _write_export_sheet(
+            wb,
+            "Пользователи",
+            ("ID", "Telegram ID", "Целевой вес", "Создан", "Смещение недели"),
+            await _max_lengths(
+                db,
+                """
+                SELECT MAX(LENGTH(id)), MAX(LENGTH(tg_id)), MAX(LENGTH(target_weight)),
+                       MAX(LENGTH(created_at)), MAX(LENGTH(week_parity_offset))
+                FROM users
+                """,
+            ),
+            (
+                (user_id, tg_id, target_weight or "", created_at or "", week_parity_offset or 0)
+                async for user_id, tg_id, target_weight, created_at, week_parity_offset in db.iter_rows(
+                    "SELECT id, tg_id, target_weight, created_at, week_parity_offset FROM users"
+                )
+            ),
+        )
         
-        # Автоширина колонок
-        for column in ws_workouts.columns:
-            max_length = 0
-            column_letter = get_column_letter(column[0].column)
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            ws_workouts.column_dimensions[column_letter].width = min(max_length + 2, 50)
+        # Лист 2: Тренировки (дата выводится как ДД.ММ.ГГГГ ЧЧ:ММ — 16 символов)
+        await _write_export_sheet(
+            wb,
+            "Тренировки",
+            ("ID", "User ID", "Дата", "Статус", "Длительность", "Заметки"),
+            await _max_lengths(
+                db,
+                """
+                SELECT MAX(LENGTH(id)), MAX(LENGTH(user_id)), 16,
+                       MAX(LENGTH(status)), MAX(LENGTH(duration)), MAX(LENGTH(notes))
+                FROM workout_logs
+                """,
+            ),
+            (
+                (
+                    log_id,
+                    user_id,
+                    datetime.fromtimestamp(date_ts, tz).strftime("%d.%m.%Y %H:%M"),
+                    status or "",
+                    duration or "",
+                    notes or "",
+                )
+                async for log_id, user_id, date_ts, status, duration, notes in db.iter_rows(
+                    "SELECT id, user_id, date, status, duration, notes FROM workout_logs ORDER BY date DESC"
+                )
+            ),
+        )
         
         # Лист 3: Вес
-        ws_weight = wb.create_sheet("Вес")
-        ws_weight.append(["ID", "User ID", "Вес", "Дата"])
-        weights = await db.fetch_all("SELECT * FROM weights ORDER BY date DESC")
-        for weight_row in weights:
-            weight_entry = dict(weight_row)
-            ws_weight.append([
-                weight_entry["id"],
-                weight_entry["user_id"],
-                weight_entry.get("weight") or "",
-                weight_entry.get("date") or "",
-            ])
-        
-        # Стилизация заголовков
-        for cell in ws_weight[1]:
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = Alignment(horizontal="center")
-        
-        # Автоширина колонок
-        for column in ws_weight.columns:
-            max_length = 0
-            column_letter = get_column_letter(column[0].column)
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            ws_weight.column_dimensions[column_letter].width = min(max_length + 2, 50)
+        await _write_export_sheet(
+            wb,
+            "Вес",
+            ("ID", "User ID", "Вес", "Дата"),
+            await _max_lengths(
+                db,
+                "SELECT MAX(LENGTH(id)), MAX(LENGTH(user_id)), MAX(LENGTH(weight)), 16 FROM weights",
+            ),
+            (
+                (entry_id, user_id, weight or "", datetime.fromtimestamp(date_ts, tz).strftime("%d.%m.%Y %H:%M"))
+                async for entry_id, user_id, weight, date_ts in db.iter_rows(
+                    "SELECT id, user_id, weight, date FROM weights ORDER BY date DESC"
+                )
+            ),
+        )
         
         # Лист 4: Расписание
-        ws_schedule = wb.create_sheet("Расписание")
-        ws_schedule.append(["ID", "User ID", "День недели", "Время", "Тип недели"])
-        schedules = await db.fetch_all("SELECT * FROM workout_schedule")
-        day_names = ["Пн", "Вт", "Ср", "Чт", "Пт", "Сб", "Вс"]
-        for schedule_row in schedules:
-            schedule = dict(schedule_row)
-            weekday = schedule.get("weekday", 0)
-            ws_schedule.append([
-                schedule["id"],
-                schedule["user_id"],
-                day_names[weekday] if weekday < len(day_names) else weekday,
-                schedule.get("time") or "",
-                schedule.get("week_type") or "any",
-            ])
-        
-        # Стилизация заголовков
-        for cell in ws_schedule[1]:
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = Alignment(horizontal="center")
-        
-        # Автоширина колонок
-        for column in ws_schedule.columns:
-            max_length = 0
-            column_letter = get_column_letter(column[0].column)
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            ws_schedule.column_dimensions[column_letter].width = min(max_length + 2, 50)
-        
-        # Сохраняем в BytesIO
-        excel_buffer = BytesIO()
-        wb.save(excel_buffer)
-        excel_buffer.seek(0)
+        await _write_export_sheet(
+            wb,
+            "Расписание",
+            ("ID", "User ID", "День недели", "Время", "Тип недели"),
+            await _max_lengths(
+                db,
+                """
+                SELECT MAX(LENGTH(id)), MAX(LENGTH(user_id)), MAX(LENGTH(weekday)), MAX(LENGTH(time)),
+                       MAX(LENGTH(week_type))
+                FROM workout_schedule
+                """,
+            ),
+            (
+                (
+                    schedule_id,
+                    user_id,
+                    WEEKDAYS_RU[weekday] if 0 <= weekday < len(WEEKDAYS_RU) else weekday,
+                    time_str or "",
+                    week_type or "any",
+                )
+                async for schedule_id, user_id, weekday, time_str, week_type in db.iter_rows(
+                    "SELECT id, user_id, weekday, time, week_type FROM workout_schedule"
+                )
+            ),
+        )
         
-        # Читаем данные в bytes
-        excel_data = excel_buffer.read()
-        excel_buffer.close()
+        # Сборка xlsx (zip) — тоже в отдельном потоке
+        excel_data = await asyncio.to_thread(_workbook_bytes, wb)
         
         # Отправляем файл
         filename = f"discipline_bot_export_{datetime.now(tz).strftime('%Y%m%d_%H%M%S')}.xlsx"
@@ -372,49 +377,54 @@ async def admin_export_handler(
         
         await query.message.edit_text(
             "✅ <b>Файл успешно создан и отправлен!</b>",
-            reply_markup=admin_panel_kb().as_markup(),
+            reply_markup=admin_panel_markup(),
         )
     except Exception as e:
         logger.error(f"Ошибка при выгрузке в Excel: {e}", exc_info=True)
         await query.message.edit_text(
             "❌ <b>Ошибка при создании Excel файла</b>\n\n"
             f"Детали: {str(e)}",
-            reply_markup=admin_panel_kb().as_markup(),
+            reply_markup=admin_panel_markup(),
         )
 
 
 @router.callback_query(F.data == "admin:users")
 async def admin_users_handler(
     query: CallbackQuery,
-    config: Config,
     db: Database,
     tz: ZoneInfo,
+    is_admin: bool = False,
 ) -> None:
     """Список пользователей"""
     if query.from_user is None or query.message is None:
         return
     
-    if not is_admin(query.from_user.id, config):
+    if not is_admin:
         await query.answer("❌ У вас нет доступа", show_alert=True)
         return
     
     await query.answer("👥 Загрузка списка пользователей...")
+
+    cached = get_admin_text("users")
+    if cached is not None:
+        await _edit_admin_text(query.message, cached)
+        return
     
     try:
-        users = await db.fetch_all("SELECT * FROM users ORDER BY created_at DESC LIMIT 50")
+        users = await db.fetch_all(
+            "SELECT id, tg_id, target_weight, created_at FROM users ORDER BY created_at DESC LIMIT 50"
+        )
         
         if not users:
             await query.message.edit_text(
                 "👥 <b>Список пользователей</b>\n\n"
                 "Пользователей пока нет.",
-                reply_markup=admin_panel_kb().as_markup(),
+                reply_markup=admin_panel_markup(),
             )
             return
         
         users_text = "👥 <b>Последние 50 пользователей:</b>\n\n"
-        for i, user_row in enumerate(users, 1):
-            user = dict(user_row)
-            created_at = user.get("created_at", "")
+        for i, (user_id, tg_id, target_weight, created_at) in enumerate(users, 1):
             if created_at:
                 try:
                     dt = datetime.fromisoformat(created_at.replace("Z", "+00:00"))
@@ -424,37 +434,34 @@ async def admin_users_handler(
             else:
                 created_str = "неизвестно"
             
-            target_weight = user.get("target_weight") or "не указан"
-            users_text += f"{i}. ID: {user['id']} | TG: {user['tg_id']} | Вес: {target_weight} | {created_str}\n"
+            users_text += f"{i}. ID: {user_id} | TG: {tg_id} | Вес: {target_weight or 'не указан'} | {created_str}\n"
         
         if len(users) == 50:
             users_text += "\n⚠️ Показаны только последние 50 пользователей"
+        set_admin_text("users", users_text)
         
-        await query.message.edit_text(
-            users_text,
-            reply_markup=admin_panel_kb().as_markup(),
-        )
+        await _edit_admin_text(query.message, users_text)
     except Exception as e:
         logger.error(f"Ошибка при получении списка пользователей: {e}", exc_info=True)
         await query.message.edit_text(
             "❌ <b>Ошибка при получении списка пользователей</b>\n\n"
             f"Детали: {str(e)}",
-            reply_markup=admin_panel_kb().as_markup(),
+            reply_markup=admin_panel_markup(),
         )
 
 
 @router.callback_query(F.data == "admin:price")
 async def admin_price_handler(
     query: CallbackQuery,
-    config: Config,
     db: Database,
     state: FSMContext,
+    is_admin: bool = False,
 ) -> None:
     """Управление ценой подписки"""
     if query.from_user is None or query.message is None:
         return
     
-    if not is_admin(query.from_user.id, config):
+    if not is_admin:
         await query.answer("❌ У вас нет доступа", show_alert=True)
         return
     
@@ -475,29 +482,29 @@ async def admin_price_handler(
         await query.message.edit_text(
             "❌ <b>Ошибка при получении цены</b>\n\n"
             f"Детали: {str(e)}",
-            reply_markup=admin_panel_kb().as_markup(),
+            reply_markup=admin_panel_markup(),
         )
 
 
 @router.message(PriceStates.waiting_price)
 async def admin_price_set(
     message: Message,
-    config: Config,
     db: Database,
     state: FSMContext,
+    is_admin: bool = False,
 ) -> None:
     """Установка новой цены подписки"""
     if message.from_user is None or message.text is None:
         return
     
-    if not is_admin(message.from_user.id, config):
+    if not is_admin:
         await message.answer("❌ У вас нет доступа")
         await state.clear()
         return
     
     if message.text.startswith("/cancel"):
         await state.clear()
-        await message.answer("❌ Изменение цены отменено", reply_markup=admin_panel_kb().as_markup())
+        await message.answer("❌ Изменение цены отменено", reply_markup=admin_panel_markup())
         return
     
     try:
@@ -528,7 +535,7 @@ async def admin_price_set(
             f"✅ <b>Цена подписки обновлена!</b>\n\n"
             f"Новая цена: <b>{new_price:.0f} ₽</b>\n\n"
             "Изменения вступят в силу для всех новых платежей.",
-            reply_markup=admin_panel_kb().as_markup(),
+            reply_markup=admin_panel_markup(),
         )
     except ValueError:
         await message.answer(
@@ -541,22 +548,22 @@ async def admin_price_set(
         await message.answer(
             f"❌ <b>Ошибка при установке цены</b>\n\n"
             f"Детали: {str(e)}",
-            reply_markup=admin_panel_kb().as_markup(),
+            reply_markup=admin_panel_markup(),
         )
 
 
 @router.callback_query(F.data == "admin:payments")
 async def admin_payments_handler(
     query: CallbackQuery,
-    config: Config,
     db: Database,
     tz: ZoneInfo,
+    is_admin: bool = False,
 ) -> None:
     """Список платежей и возможность подтвердить вручную"""
     if query.from_user is None or query.message is None:
         return
     
-    if not is_admin(query.from_user.id, config):
+    if not is_admin:
         await query.answer("❌ У вас нет доступа", show_alert=True)
         return
     
@@ -565,24 +572,21 @@ async def admin_payments_handler(
     try:
         # Получаем последние 20 pending платежей
         pending_payments = await db.fetch_all(
-            "SELECT * FROM payments WHERE status = 'pending' ORDER BY created_at DESC LIMIT 20"
+            "SELECT payment_id, user_id, amount, created_at FROM payments "
+            "WHERE status = 'pending' ORDER BY created_at DESC LIMIT 20"
         )
         
         # Получаем последние 10 успешных платежей
         succeeded_payments = await db.fetch_all(
-            "SELECT * FROM payments WHERE status = 'succeeded' ORDER BY paid_at DESC LIMIT 10"
+            "SELECT user_id, amount, paid_at FROM payments WHERE status = 'succeeded' ORDER BY paid_at DESC LIMIT 10"
         )
         
         text = "💳 <b>Платежи</b>\n\n"
         
         if pending_payments:
             text += f"⏳ <b>Ожидают подтверждения ({len(pending_payments)}):</b>\n"
-            for i, payment_row in enumerate(pending_payments[:10], 1):
-                payment = dict(payment_row)
-                user_id = payment["user_id"]
-                amount = payment["amount"]
-                payment_id = payment["payment_id"]
-                created = payment.get("created_at", "")[:16] if payment.get("created_at") else "неизвестно"
+            for i, (payment_id, user_id, amount, created_at) in enumerate(pending_payments[:10], 1):
+                created = created_at[:16] if created_at else "неизвестно"
                 text += f"{i}. ID: {payment_id[:20]}... | User: {user_id} | {amount} ₽ | {created}\n"
             
             if len(pending_payments) > 10:
@@ -594,12 +598,9 @@ async def admin_payments_handler(
         
         if succeeded_payments:
             text += f"✅ <b>Последние успешные ({len(succeeded_payments)}):</b>\n"
-            for i, payment_row in enumerate(succeeded_payments[:5], 1):
-                payment = dict(payment_row)
-                user_id = payment["user_id"]
-                amount = payment["amount"]
-                paid_at = payment.get("paid_at", "")[:16] if payment.get("paid_at") else "неизвестно"
-                text += f"{i}. User: {user_id} | {amount} ₽ | {paid_at}\n"
+            for i, (user_id, amount, paid_at) in enumerate(succeeded_payments[:5], 1):
+                paid_at_str = paid_at[:16] if paid_at else "неизвестно"
+                text += f"{i}. User: {user_id} | {amount} ₽ | {paid_at_str}\n"
         
         from aiogram.utils.keyboard import InlineKeyboardBuilder
         kb = InlineKeyboardBuilder()
@@ -615,28 +616,62 @@ async def admin_payments_handler(
         await query.message.edit_text(
             "❌ <b>Ошибка при получении списка платежей</b>\n\n"
             f"Детали: {str(e)}",
-            reply_markup=admin_panel_kb().as_markup(),
+            reply_markup=admin_panel_markup(),
         )
 
 
+# Сообщений рассылки в секунду (общий лимит бота в Telegram — около 30) и как часто обновлять прогресс (в пачках)
+_BROADCAST_BATCH_SIZE = 25
+_BROADCAST_PROGRESS_EVERY = 10
+
+
+async def _broadcast_one(bot: Bot, tg_id: int, text: str) -> bool:
+    """Отправить сообщение рассылки; при флуд-лимите — одна повторная попытка после паузы."""
+    for attempt in range(2):
+        try:
+            await bot.send_message(tg_id, text, parse_mode="HTML")
+            return True
+        except TelegramRetryAfter as e:
+            if attempt:
+                logger.warning(f"Не удалось отправить сообщение пользователю {tg_id}: {e}")
+                return False
+            await asyncio.sleep(e.retry_after)
+        except Exception as e:
+            logger.warning(f"Не удалось отправить сообщение пользователю {tg_id}: {e}")
+            return False
+    return False
+
+
 @router.callback_query(F.data == "admin:broadcast")
 async def admin_broadcast_start(
     query: CallbackQuery,
-    config: Config,
     state: FSMContext,
+    is_admin: bool = False,
 ) -> None:
     """Начало рассылки сообщений"""
     if query.from_user is None or query.message is None:
         return
     
-    if not is_admin(query.from_user.id, config):
+    if not is_admin:
         await query.answer("❌ У вас нет доступа", show_alert=True)
         return
     
+    if await state.get_state() == BroadcastStates.sending.state:
+        await query.answer("⏳ Рассылка уже идёт, дождитесь её завершения", show_alert=True)
+        return
+    
     await query.answer()
     await state.set_state(BroadcastStates.waiting_message)
+    data = await state.get_data()
+    resume_hint = ""
+    if data.get("broadcast_text"):
+        resume_hint = (
+            f"⚠️ Предыдущая рассылка прервалась после {data['success'] + data['failed']} получателей.\n"
+            "Чтобы продолжить её с места остановки, отправьте /resume\n\n"
+        )
     await query.message.edit_text(
         "📢 <b>Рассылка сообщений</b>\n\n"
+        f"{resume_hint}"
         "Введите сообщение для рассылки всем пользователям.\n\n"
         "Используйте HTML разметку для форматирования.\n"
         "Для отмены отправьте /cancel",
@@ -647,43 +682,78 @@ async def admin_broadcast_start(
 @router.message(BroadcastStates.waiting_message)
 async def admin_broadcast_send(
     message: Message,
-    config: Config,
     db: Database,
     state: FSMContext,
+    is_admin: bool = False,
 ) -> None:
     """Отправка рассылки"""
     if message.from_user is None or message.text is None:
         return
     
-    if not is_admin(message.from_user.id, config):
+    if not is_admin:
         await message.answer("❌ У вас нет доступа")
         await state.clear()
         return
     
     if message.text.startswith("/cancel"):
         await state.clear()
-        await message.answer("❌ Рассылка отменена", reply_markup=admin_panel_kb().as_markup())
+        await message.answer("❌ Рассылка отменена", reply_markup=admin_panel_markup())
         return
     
-    await message.answer("📤 Начинаю рассылку...")
+    data = await state.get_data()
+    if message.text.startswith("/resume"):
+        # Состояние в памяти: после перезапуска сохранённой рассылки может не быть
+        if not data.get("broadcast_text"):
+            await message.answer(
+                "ℹ️ Нет прерванной рассылки.\n\n"
+                "Введите сообщение для новой рассылки или отправьте /cancel для отмены."
+            )
+            return
+        # Продолжаем прерванную рассылку: текст, курсор и счётчики сохранены в состоянии
+        text = data["broadcast_text"]
+        last_id, success, failed = data["last_id"], data["success"], data["failed"]
+        progress = await message.answer(f"📤 Продолжаю рассылку ({success + failed} уже обработано)...")
+    elif message.text.startswith("/"):
+        # Команды не рассылаем: новую рассылку начинает только обычный текст
+        await message.answer("⚠️ Введите текст сообщения для рассылки или отправьте /cancel для отмены.")
+        return
+    else:
+        text = message.text
+        last_id, success, failed = 0, 0, 0
+        progress = await message.answer("📤 Начинаю рассылку...")
     
+    # На время отправки — отдельное состояние: повторный /resume или новый текст не запустят второй цикл
+    await state.set_state(BroadcastStates.sending)
     try:
-        users = await db.fetch_all("SELECT tg_id FROM users")
-        total = len(users)
-        success = 0
-        failed = 0
-        
-        for user in users:
-            try:
-                await message.bot.send_message(
-                    user["tg_id"],
-                    message.text,
-                    parse_mode="HTML",
-                )
-                success += 1
-            except Exception as e:
-                logger.warning(f"Не удалось отправить сообщение пользователю {user['tg_id']}: {e}")
-                failed += 1
+        total_row = await db.fetch_one("SELECT COUNT(*) AS count FROM users;")
+        total = total_row["count"] if total_row else 0
+        batch_no = 0
+        batch_started_at: Optional[float] = None
+        
+        # Получатели читаются страницами, пачка отправляется параллельно,
+        # но не чаще раза в секунду — укладываемся в лимит Telegram.
+        # После каждой пачки курсор (id последнего получателя) сохраняется в состоянии,
+        # чтобы прерванную рассылку можно было продолжить через /resume
+        async for page in queries.iter_user_tg_ids(db, after_id=last_id):
+            for start in range(0, len(page), _BROADCAST_BATCH_SIZE):
+                if batch_started_at is not None:
+                    elapsed = monotonic() - batch_started_at
+                    if elapsed < 1:
+                        await asyncio.sleep(1 - elapsed)
+                batch_started_at = monotonic()
+                batch = page[start : start + _BROADCAST_BATCH_SIZE]
+                results = await asyncio.gather(*(_broadcast_one(message.bot, row["tg_id"], text) for row in batch))
+                success += sum(results)
+                failed += len(results) - sum(results)
+                last_id = batch[-1]["id"]
+                await state.update_data(broadcast_text=text, last_id=last_id, success=success, failed=failed)
+                batch_no += 1
+                if batch_no % _BROADCAST_PROGRESS_EVERY == 0:
+                    try:
+                        await progress.edit_text(f"📤 Рассылка: {success + failed} из {total}...")
+                    except Exception:
+                        pass
+        total = success + failed
         
         await state.clear()
         await message.answer(
@@ -692,13 +762,22 @@ async def admin_broadcast_send(
             f"• Всего пользователей: {total}\n"
             f"• Успешно отправлено: {success}\n"
             f"• Ошибок: {failed}",
-            reply_markup=admin_panel_kb().as_markup(),
+            reply_markup=admin_panel_markup(),
         )
     except Exception as e:
         logger.error(f"Ошибка при рассылке: {e}", exc_info=True)
-        await state.clear()
+        # Данные не сбрасываем: рассылку можно продолжить с сохранённого курсора
+        await state.set_state(BroadcastStates.waiting_message)
         await message.answer(
             f"❌ <b>Ошибка при рассылке</b>\n\n"
-            f"Детали: {str(e)}",
-            reply_markup=admin_panel_kb().as_markup(),
+            f"Детали: {str(e)}\n\n"
+            f"Обработано получателей: {success + failed}. "
+            "Отправьте /resume, чтобы продолжить, или /cancel для отмены.",
+            reply_markup=admin_panel_markup(),
         )
+
+
+@router.message(BroadcastStates.sending)
+async def admin_broadcast_busy(message: Message) -> None:
+    """Ввод во время идущей рассылки"""
+    await message.answer("⏳ Рассылка ещё идёт. Дождитесь её завершения — о результате придёт сообщение.")
@@ -13,7 +13,8 @@ from aiogram.types import Message
 from app.config import Config
 from app.db.database import Database
 from app.db import queries
-from app.utils.keyboards import main_menu_kb
+from app.handlers.common import START_REQUIRED_SHORT_TEXT, require_user
+from app.utils.keyboards import main_menu_markup
 from app.utils.parsing import parse_calories
 
 logger = logging.getLogger(__name__)
@@ -35,9 +36,8 @@ async def calories_command(
 ) -> None:
     if message.from_user is None:
         return
-    user = await queries.get_user_by_tg_id(db, message.from_user.id)
-    if not user:
-        await message.answer("👋 Для начала работы выполните /start")
+    user = await require_user(message, db, START_REQUIRED_SHORT_TEXT)
+    if user is None:
         return
 
     parts = (message.text or "").split(maxsplit=1)
@@ -108,11 +108,10 @@ async def _add_and_confirm(
 ) -> None:
     now = datetime.now(tz)
     date_day = now.strftime("%Y-%m-%d")
-    await queries.add_calorie_log(db, user_id, date_day, calories, now)
-    total = await queries.get_calories_sum_for_day(db, user_id, date_day)
+    total = await queries.add_calorie_log_and_get_total(db, user_id, date_day, calories, now)
     logger.info(f"🔥 Калории добавлены: user_id={user_id}, +{calories} ккал, сегодня всего {total}")
     await message.answer(
         f"✅ <b>+{calories} ккал</b> добавлено.\n\n"
         f"📅 Сегодня всего: <b>{total}</b> ккал",
-        reply_markup=main_menu_kb(config.admin_ids, tg_id).as_markup(),
+        reply_markup=main_menu_markup(config.admin_ids, tg_id),
     )
@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+from typing import Optional
+
+from aiogram.types import Message
+
+from app.db.database import Database
+from app.db import queries
+
+
+# Ответ пользователю, который еще не прошел /start
+START_REQUIRED_TEXT = "👋 Привет!\n\nДля начала работы выполните команду /start"
+START_REQUIRED_SHORT_TEXT = "👋 Для начала работы выполните /start"
+
+
+async def require_user(message: Message, db: Database, text: str = START_REQUIRED_TEXT) -> Optional[dict]:
+    """Пользователь автора сообщения; если его нет — отвечает подсказкой про /start и возвращает None."""
+    user = await queries.get_user_by_tg_id(db, message.from_user.id)
+    if not user:
+        await message.answer(text)
+        return None
+    return user
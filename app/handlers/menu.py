@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from typing import Optional
+
 from aiogram import Router, F
 from aiogram.fsm.context import FSMContext
 from aiogram.types import CallbackQuery
@@ -9,6 +11,7 @@ from app.config import Config
 from app.db.database import Database
 from app.db import queries
 from app.handlers import schedule, reports, profile
+from app.handlers.common import START_REQUIRED_SHORT_TEXT, START_REQUIRED_TEXT
 from app.handlers.weight import WeightStates
 from app.handlers.calories import CalorieStates
 from app.services.access import (
@@ -16,12 +19,144 @@ from app.services.access import (
     get_product_price_text,
     access_status_display,
 )
-from app.utils.keyboards import main_menu_kb, schedule_mode_kb, subscription_kb
-from app.utils.parsing import format_schedule
+from app.utils.keyboards import main_menu_markup, schedule_mode_markup, subscription_kb
+from app.utils.parsing import render_schedule_sections
 
 
 router = Router()
 
+# Разделы меню, которым нужна строка пользователя, и что ответить незарегистрированному
+_START_REQUIRED = {
+    "schedule": START_REQUIRED_TEXT,
+    "calories": START_REQUIRED_SHORT_TEXT,
+    "report": START_REQUIRED_TEXT,
+    "stats": START_REQUIRED_TEXT,
+    "profile": START_REQUIRED_TEXT,
+    "subscription": START_REQUIRED_SHORT_TEXT,
+}
+# Статичные тексты меню собираются один раз при импорте; в шаблоны подставляется только переменная часть
+_SCHEDULE_TMPL = "📋 <b>Управление расписанием</b>\n\n{schedule}\n\n<b>Выберите действие:</b>"
+_WEIGHT_PROMPT_TEXT = (
+    "⚖️ <b>Введите текущий вес</b>\n\n"
+    "Укажите вес в килограммах одним числом.\n\n"
+    "Примеры:\n"
+    "• <code>82.4</code>\n"
+    "• <code>75</code>\n"
+    "• <code>90.5</code>"
+)
+_CALORIES_PROMPT_TEXT = (
+    "🔥 <b>Добавить калории</b>\n\n"
+    "Введите количество ккал (целое число).\n\n"
+    "Примеры: <code>500</code>, <code>1200</code>"
+)
+_SUBSCRIPTION_TMPL = (
+    "📋 <b>Подписка</b>\n\n"
+    "🔐 <b>Доступ:</b> {status}\n\n"
+    "{description}\n\n"
+    "{price}\n\n"
+    "Подробнее — /tariff"
+)
+
+
+# Обработчики разделов меню получают уже загруженного пользователя (None для разделов вне _START_REQUIRED)
+async def _show_schedule(
+    query: CallbackQuery, state: FSMContext, db: Database, tz: ZoneInfo, config: Config, user: Optional[dict], is_admin: bool
+) -> None:
+    # Показываем текущее расписание раздельно для четных и нечетных
+    current_schedule = await queries.get_workout_schedule(db, int(user["id"]))
+    schedule_text = render_schedule_sections(current_schedule)
+    
+    await state.update_data(user_id=int(user["id"]))
+    await state.set_state(schedule.ScheduleStates.waiting_mode)
+    await query.message.answer(
+        _SCHEDULE_TMPL.format(schedule=schedule_text),
+        reply_markup=schedule_mode_markup(),
+    )
+
+
+async def _ask_weight(
+    query: CallbackQuery, state: FSMContext, db: Database, tz: ZoneInfo, config: Config, user: Optional[dict], is_admin: bool
+) -> None:
+    await state.set_state(WeightStates.waiting_weight)
+    await query.message.answer(_WEIGHT_PROMPT_TEXT)
+
+
+async def _ask_calories(
+    query: CallbackQuery, state: FSMContext, db: Database, tz: ZoneInfo, config: Config, user: Optional[dict], is_admin: bool
+) -> None:
+    await state.set_state(CalorieStates.waiting_calories)
+    await state.update_data(user_id=int(user["id"]))
+    await query.message.answer(_CALORIES_PROMPT_TEXT)
+
+
+async def _show_report(
+    query: CallbackQuery, state: FSMContext, db: Database, tz: ZoneInfo, config: Config, user: Optional[dict], is_admin: bool
+) -> None:
+    week_parity_offset = int(user.get("week_parity_offset") or 0)
+    await reports.show_report(query.message, db, tz, int(user["id"]), week_parity_offset)
+
+
+async def _show_stats(
+    query: CallbackQuery, state: FSMContext, db: Database, tz: ZoneInfo, config: Config, user: Optional[dict], is_admin: bool
+) -> None:
+    week_parity_offset = int(user.get("week_parity_offset") or 0)
+    await reports.show_stats(query.message, db, tz, int(user["id"]), week_parity_offset)
+
+
+async def _show_profile(
+    query: CallbackQuery, state: FSMContext, db: Database, tz: ZoneInfo, config: Config, user: Optional[dict], is_admin: bool
+) -> None:
+    await profile.show_profile(query.message, db, tz, int(user["id"]), config, user=user)
+
+
+async def _show_subscription(
+    query: CallbackQuery, state: FSMContext, db: Database, tz: ZoneInfo, config: Config, user: Optional[dict], is_admin: bool
+) -> None:
+    status_text, pay_now, extend = access_status_display(
+        user, query.from_user.id, config, tz
+    )
+    product_price = await get_product_price_text(db)
+    text = _SUBSCRIPTION_TMPL.format(status=status_text, description=PRODUCT_DESCRIPTION, price=product_price)
+    from app.services.access import get_subscription_price_rub
+    price = await get_subscription_price_rub(db)
+    kb = subscription_kb(pay_now=pay_now, extend=extend, price=price)
+    if pay_now or extend:
+        await query.message.answer(text, reply_markup=kb.as_markup())
+    else:
+        await query.message.answer(
+            text,
+            reply_markup=main_menu_markup(config.admin_ids, query.from_user.id),
+        )
+
+
+async def _show_main_menu(
+    query: CallbackQuery, state: FSMContext, db: Database, tz: ZoneInfo, config: Config, user: Optional[dict], is_admin: bool
+) -> None:
+    await query.message.answer(
+        "Главное меню:",
+        reply_markup=main_menu_markup(config.admin_ids, query.from_user.id),
+    )
+
+
+async def _show_admin_panel(
+    query: CallbackQuery, state: FSMContext, db: Database, tz: ZoneInfo, config: Config, user: Optional[dict], is_admin: bool
+) -> None:
+    from app.handlers.admin import admin_panel_handler
+    await admin_panel_handler(query, is_admin)
+
+
+_ACTIONS = {
+    "schedule": _show_schedule,
+    "weight": _ask_weight,
+    "calories": _ask_calories,
+    "report": _show_report,
+    "stats": _show_stats,
+    "profile": _show_profile,
+    "subscription": _show_subscription,
+    "back": _show_main_menu,
+    "admin": _show_admin_panel,
+}
+
 
 @router.callback_query(F.data.startswith("menu:"))
 async def menu_handler(
@@ -30,174 +165,24 @@ async def menu_handler(
     db: Database,
     tz: ZoneInfo,
     config: Config,
+    user: Optional[dict] = None,
+    is_admin: bool = False,
 ) -> None:
     if query.data is None or query.message is None or query.from_user is None:
         return
-    action = query.data.split(":")[1]
+    _, _, action = query.data.partition(":")
     await query.answer()
-
-    if action == "schedule":
-        # Проверяем, что пользователь существует
-        user = await queries.get_user_by_tg_id(db, query.from_user.id)
-        if not user:
-            await query.message.answer(
-                "👋 Привет!\n\n"
-                "Для начала работы выполните команду /start"
-            )
-            return
-        
-        # Вызываем schedule_command напрямую с правильными параметрами
-        if query.message is None:
-            return
-        
-        # Показываем текущее расписание раздельно для четных и нечетных
-        current_schedule = await queries.get_workout_schedule(db, int(user["id"]))
-        
-        even_schedule = [s for s in current_schedule if s.get("week_type") == "even"]
-        odd_schedule = [s for s in current_schedule if s.get("week_type") == "odd"]
-        any_schedule = [s for s in current_schedule if s.get("week_type") == "any"]
-        
-        # Формируем красиво оформленный текст с абзацами
-        schedule_parts = []
-        
-        if even_schedule:
-            formatted = format_schedule(even_schedule, include_week_type=False)
-            schedule_parts.append(f"📅 <b>Четные недели:</b>\n{formatted}")
-        
-        if odd_schedule:
-            formatted = format_schedule(odd_schedule, include_week_type=False)
-            schedule_parts.append(f"📅 <b>Нечетные недели:</b>\n{formatted}")
-        
-        if any_schedule:
-            formatted = format_schedule(any_schedule, include_week_type=False)
-            schedule_parts.append(f"📅 <b>Все недели:</b>\n{formatted}")
-        
-        if not schedule_parts:
-            schedule_text = "⚠️ Расписание не настроено"
-        else:
-            schedule_text = "\n\n".join(schedule_parts)
-        
-        await state.update_data(user_id=int(user["id"]))
-        await state.set_state(schedule.ScheduleStates.waiting_mode)
-        await query.message.answer(
-            f"📋 <b>Управление расписанием</b>\n\n"
-            f"{schedule_text}\n\n"
-            f"<b>Выберите действие:</b>",
-            reply_markup=schedule_mode_kb().as_markup(),
-        )
-        return
-
-    if action == "weight":
-        await state.set_state(WeightStates.waiting_weight)
-        await query.message.answer(
-            "⚖️ <b>Введите текущий вес</b>\n\n"
-            "Укажите вес в килограммах одним числом.\n\n"
-            "Примеры:\n"
-            "• <code>82.4</code>\n"
-            "• <code>75</code>\n"
-            "• <code>90.5</code>"
-        )
-        return
-
-    if action == "calories":
-        user = await queries.get_user_by_tg_id(db, query.from_user.id)
-        if not user:
-            await query.message.answer("👋 Для начала работы выполните /start")
-            return
-        await state.set_state(CalorieStates.waiting_calories)
-        await state.update_data(user_id=int(user["id"]))
-        await query.message.answer(
-            "🔥 <b>Добавить калории</b>\n\n"
-            "Введите количество ккал (целое число).\n\n"
-            "Примеры: <code>500</code>, <code>1200</code>"
-        )
-        return
-
-    if action == "report":
-        # Проверяем, что пользователь существует
-        user = await queries.get_user_by_tg_id(db, query.from_user.id)
-        if not user:
-            if query.message:
-                await query.message.answer(
-                "👋 Привет!\n\n"
-                "Для начала работы выполните команду /start"
-            )
-            return
-        if query.message is None:
-            return
-        week_parity_offset = int(user.get("week_parity_offset") or 0)
-        await reports.show_report(query.message, db, tz, int(user["id"]), week_parity_offset)
+    handler = _ACTIONS.get(action)
+    if handler is None:
         return
 
-    if action == "stats":
-        # Проверяем, что пользователь существует
-        user = await queries.get_user_by_tg_id(db, query.from_user.id)
+    # Пользователя обычно уже загрузил AccessMiddleware (data["user"]); иначе — один запрос на все разделы
+    start_required_text = _START_REQUIRED.get(action)
+    if start_required_text is not None:
+        if user is None:
+            user = await queries.get_user_by_tg_id(db, query.from_user.id)
         if not user:
-            if query.message:
-                await query.message.answer(
-                "👋 Привет!\n\n"
-                "Для начала работы выполните команду /start"
-            )
+            await query.message.answer(start_required_text)
             return
-        if query.message is None:
-            return
-        week_parity_offset = int(user.get("week_parity_offset") or 0)
-        await reports.show_stats(query.message, db, tz, int(user["id"]), week_parity_offset)
-        return
-
-    if action == "profile":
-        user = await queries.get_user_by_tg_id(db, query.from_user.id)
-        if not user:
-            if query.message:
-                await query.message.answer(
-                    "👋 Привет!\n\n"
-                    "Для начала работы выполните команду /start"
-                )
-            return
-        if query.message is None:
-            return
-        await profile.show_profile(query.message, db, tz, int(user["id"]), config)
-        return
 
-    if action == "subscription":
-        user = await queries.get_user_by_tg_id(db, query.from_user.id)
-        if not user:
-            if query.message:
-                await query.message.answer("👋 Для начала работы выполните /start")
-            return
-        if query.message is None:
-            return
-        status_text, pay_now, extend = access_status_display(
-            user, query.from_user.id, config, tz
-        )
-        product_price = await get_product_price_text(db)
-        text = (
-            "📋 <b>Подписка</b>\n\n"
-            f"🔐 <b>Доступ:</b> {status_text}\n\n"
-            f"{PRODUCT_DESCRIPTION}\n\n"
-            f"{product_price}\n\n"
-            "Подробнее — /tariff"
-        )
-        from app.services.access import get_subscription_price_rub
-        price = await get_subscription_price_rub(db)
-        kb = subscription_kb(pay_now=pay_now, extend=extend, price=price)
-        if pay_now or extend:
-            await query.message.answer(text, reply_markup=kb.as_markup())
-        else:
-            await query.message.answer(
-                text,
-                reply_markup=main_menu_kb(config.admin_ids, query.from_user.id).as_markup(),
-            )
-        return
-
-    if action == "back":
-        await query.message.answer(
-            "Главное меню:",
-            reply_markup=main_menu_kb(config.admin_ids, query.from_user.id).as_markup(),
-        )
-        return
-
-    if action == "admin":
-        from app.handlers.admin import admin_panel_handler
-        await admin_panel_handler(query, config)
-        return
+    await handler(query, state, db, tz, config, user, is_admin)
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 from datetime import datetime
 from zoneinfo import ZoneInfo
 
@@ -10,17 +11,40 @@ from aiogram.types import Message
 from app.config import Config
 from app.db.database import Database
 from app.db import queries
+from app.handlers.common import require_user
 from app.services.access import access_status_display
 from app.services.discipline import is_user_week_even
 from app.services.calories import compute_calorie_profile
-from app.utils.keyboards import main_menu_kb
-from app.utils.parsing import format_schedule
+from app.utils.keyboards import main_menu_markup
+from app.utils.parsing import format_schedule, split_by_week_type
 
 
 router = Router()
 
 GOAL_LABELS = {"lose": "похудение", "maintain": "удержание", "gain": "набор массы"}
 
+# Постоянные части профиля собираются один раз при импорте; необязательные блоки несут свои отступы
+_PROFILE_TMPL = (
+    "📊 <b>Профиль</b>\n\n"
+    "🎯 <b>Целевой вес:</b> {target}\n"
+    "⚖️ <b>Текущий вес:</b> {current}"
+    "{calories}\n\n"
+    "{access}"
+    "📅 <b>Расписание:</b>\n{schedule}\n"
+    "📆 <b>Текущая неделя:</b> {week}"
+)
+_ACCESS_TMPL = "🔐 <b>Доступ:</b> {status}\n\n"
+_CALORIES_TMPL = (
+    "\n\n"
+    "🔥 <b>Норма калорий</b> (формула Mifflin–St Jeor)\n"
+    "• Базовый обмен (в покое): <b>{bmr}</b> ккал\n"
+    "• Суточная норма (с учётом активности): <b>{tdee}</b> ккал/день\n"
+    "• Цель <b>{goal}</b> → <b>{target}</b> ккал/день\n"
+    "• ИМТ: <b>{bmi}</b> ({bmi_category})\n"
+    "• Сегодня съедено: <b>{today}</b> ккал"
+)
+_FILL_PROFILE_TEXT = "\n\n⚠️ Заполните рост, возраст и пол в /start для расчёта нормы калорий и ИМТ."
+
 
 async def build_profile_text(
     db: Database,
@@ -28,9 +52,23 @@ async def build_profile_text(
     tz: ZoneInfo,
     config: Config | None = None,
     tg_id: int | None = None,
+    user: dict | None = None,
 ) -> str:
-    user_row = await db.fetch_one("SELECT * FROM users WHERE id = ?;", (user_id,))
-    user = dict(user_row) if user_row else {}
+    # Независимые чтения идут параллельно на разных соединениях пула;
+    # уже загруженного в этом апдейте пользователя повторно не читаем
+    if user is None:
+        user, schedule, latest_weight = await asyncio.gather(
+            queries.get_user_by_id(db, user_id),
+            queries.get_workout_schedule(db, user_id),
+            queries.get_latest_weight(db, user_id),
+        )
+    else:
+        schedule, latest_weight = await asyncio.gather(
+            queries.get_workout_schedule(db, user_id),
+            queries.get_latest_weight(db, user_id),
+        )
+    user = user or {}
+    now = datetime.now(tz)
     uid = user.get("tg_id") if user else None
     tg_id = tg_id if tg_id is not None else uid
     target_weight = user.get("target_weight")
@@ -41,19 +79,15 @@ async def build_profile_text(
     activity_level = user.get("activity_level")
     goal = user.get("goal")
 
-    schedule = await queries.get_workout_schedule(db, user_id)
-    latest_weight = await queries.get_latest_weight(db, user_id)
     current_weight_val = latest_weight["weight"] if latest_weight else None
     current_weight_str = f"{current_weight_val:.1f} кг" if isinstance(current_weight_val, (int, float)) else "нет данных"
 
     week_parity_text = "не задана"
     if week_parity_offset is not None:
-        even_now = is_user_week_even(datetime.now(tz), int(week_parity_offset))
+        even_now = is_user_week_even(now, int(week_parity_offset))
         week_parity_text = "четная" if even_now else "нечетная"
 
-    even_schedule = [s for s in schedule if s.get("week_type") == "even"]
-    odd_schedule = [s for s in schedule if s.get("week_type") == "odd"]
-    any_schedule = [s for s in schedule if s.get("week_type") == "any"]
+    even_schedule, odd_schedule, any_schedule = split_by_week_type(schedule)
     schedule_text = ""
     if even_schedule:
         schedule_text += f"📅 Четные недели: {format_schedule(even_schedule)}\n"
@@ -66,13 +100,8 @@ async def build_profile_text(
 
     target_weight_str = f"{target_weight:.1f} кг" if target_weight is not None else "не задан"
 
-    parts = [
-        "📊 <b>Профиль</b>\n",
-        f"🎯 <b>Целевой вес:</b> {target_weight_str}",
-        f"⚖️ <b>Текущий вес:</b> {current_weight_str}",
-    ]
-
     # Калории, ИМТ, цель — считаем по текущему весу
+    calories_text = ""
     if current_weight_val and height_cm and birth_year and gender:
         cp = compute_calorie_profile(
             weight_kg=current_weight_val,
@@ -81,51 +110,59 @@ async def build_profile_text(
             gender=gender,
             activity_level=activity_level,
             goal=goal,
-            now=datetime.now(tz),
+            now=now,
         )
         if cp:
-            parts.append("")
-            parts.append("🔥 <b>Норма калорий</b> (формула Mifflin–St Jeor)")
-            parts.append(f"• Базовый обмен (в покое): <b>{int(cp.bmr)}</b> ккал")
-            parts.append(f"• Суточная норма (с учётом активности): <b>{int(cp.tdee)}</b> ккал/день")
-            parts.append(f"• Цель <b>{GOAL_LABELS.get(cp.goal, cp.goal)}</b> → <b>{cp.daily_target}</b> ккал/день")
-            parts.append(f"• ИМТ: <b>{cp.bmi}</b> ({cp.bmi_category})")
-            today = datetime.now(tz).strftime("%Y-%m-%d")
+            today = now.strftime("%Y-%m-%d")
             today_cals = await queries.get_calories_sum_for_day(db, user_id, today)
-            parts.append(f"• Сегодня съедено: <b>{today_cals}</b> ккал")
+            calories_text = _CALORIES_TMPL.format(
+                bmr=int(cp.bmr),
+                tdee=int(cp.tdee),
+                goal=GOAL_LABELS.get(cp.goal, cp.goal),
+                target=cp.daily_target,
+                bmi=cp.bmi,
+                bmi_category=cp.bmi_category,
+                today=today_cals,
+            )
     else:
-        parts.append("")
-        parts.append("⚠️ Заполните рост, возраст и пол в /start для расчёта нормы калорий и ИМТ.")
+        calories_text = _FILL_PROFILE_TEXT
 
-    parts.append("")
+    access_text = ""
     if config is not None and tg_id is not None:
         status_text, _, _ = access_status_display(user, int(tg_id), config, tz)
-        parts.append(f"🔐 <b>Доступ:</b> {status_text}")
-        parts.append("")
-    parts.append(f"📅 <b>Расписание:</b>\n{schedule_text}")
-    parts.append(f"📆 <b>Текущая неделя:</b> {week_parity_text}")
+        access_text = _ACCESS_TMPL.format(status=status_text)
 
-    return "\n".join(parts)
+    return _PROFILE_TMPL.format(
+        target=target_weight_str,
+        current=current_weight_str,
+        calories=calories_text,
+        access=access_text,
+        schedule=schedule_text,
+        week=week_parity_text,
+    )
 
 
-async def show_profile(message: Message, db: Database, tz: ZoneInfo, user_id: int, config: Config = None) -> None:
+async def show_profile(
+    message: Message,
+    db: Database,
+    tz: ZoneInfo,
+    user_id: int,
+    config: Config = None,
+    user: dict | None = None,
+) -> None:
     """Вспомогательная функция для показа профиля по user_id"""
     tg_id = message.from_user.id if message.from_user else None
-    text = await build_profile_text(db, user_id, tz, config=config, tg_id=tg_id)
+    text = await build_profile_text(db, user_id, tz, config=config, tg_id=tg_id, user=user)
     admin_ids = config.admin_ids if config else None
     user_tg_id = message.from_user.id if message.from_user else None
-    await message.answer(text, reply_markup=main_menu_kb(admin_ids, user_tg_id).as_markup())
+    await message.answer(text, reply_markup=main_menu_markup(admin_ids, user_tg_id))
 
 
 @router.message(Command("profile"))
 async def profile_command(message: Message, db: Database, tz: ZoneInfo, config: Config) -> None:
     if message.from_user is None:
         return
-    user = await queries.get_user_by_tg_id(db, message.from_user.id)
-    if not user:
-        await message.answer(
-            "👋 Привет!\n\n"
-            "Для начала работы выполните команду /start"
-        )
+    user = await require_user(message, db)
+    if user is None:
         return
-    await show_profile(message, db, tz, int(user["id"]), config)
+    await show_profile(message, db, tz, int(user["id"]), config, user=user)
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import asyncio
+import logging
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 
@@ -9,12 +11,65 @@ from aiogram.types import Message, BufferedInputFile
 
 from app.db.database import Database
 from app.db import queries
+from app.handlers.common import require_user
 from app.services.analytics import build_monthly_report, month_range
 from app.services.discipline import calculate_discipline_score, count_scheduled_workouts
 from app.utils.charts import build_weight_chart
 
 
 router = Router()
+logger = logging.getLogger(__name__)
+
+# Фоновые отправки графика: ссылки держим, чтобы задачи не собрал сборщик мусора
+_background_tasks: set[asyncio.Task[None]] = set()
+
+# Тексты отчетов собираются один раз при импорте; при показе подставляются только значения
+_NO_DATA = "нет данных"
+_REPORT_TMPL = (
+    "📊 <b>Месячный отчет</b>\n"
+    "📅 Период: {start:%d.%m.%Y} — {end:%d.%m.%Y}\n\n"
+    "⚖️ <b>Прогресс веса:</b>\n"
+    "   • Стартовый вес: {start_weight}\n"
+    "   • Текущий вес: {end_weight}\n"
+    "   • Изменение: {diff} ({diff_percent})\n\n"
+    "🏋️ <b>Тренировки:</b>\n"
+    "   ✅ Выполнено: {completed}\n"
+    "   ❌ Пропущено: {missed}\n\n"
+    "📈 <b>Дисциплина: {score:.1f}%</b>"
+)
+_REPORT_LOW_DISCIPLINE_TEXT = (
+    "⚠️ <b>Внимание!</b>\n\n"
+    "Ваша дисциплина ниже 70%. Это зона риска.\n\n"
+    "💪 Верните регулярность тренировок немедленно!\n"
+    "Помните: стабильность — ключ к успеху."
+)
+_STATS_TMPL = (
+    "📊 <b>Статистика за 30 дней</b>\n\n"
+    "🏋️ <b>Тренировки:</b>\n"
+    "   ✅ Выполнено: {done}\n"
+    "   ❌ Пропущено: {missed}\n"
+    "   📅 Запланировано: {scheduled}\n\n"
+    "📈 <b>Дисциплина: {score:.1f}%</b>\n\n"
+    "{weight}"
+)
+_STATS_WEIGHT_DIFF_TMPL = "⚖️ <b>Вес:</b>\n   • Текущий: {current}\n   • 30 дней назад: {old:.1f} кг\n   • Изменение: {diff}"
+_STATS_WEIGHT_TMPL = "⚖️ <b>Текущий вес:</b> {current}"
+_STATS_NO_WEIGHT_TEXT = "⚖️ <b>Вес:</b> нет данных"
+_STATS_LOW_DISCIPLINE_TEXT = (
+    "⚠️ <b>Внимание!</b>\n\n"
+    "Дисциплина ниже 70%.\n\n"
+    "💪 Стабильность — основа прогресса.\n"
+    "Исправляйтесь и возвращайтесь в ритм!"
+)
+
+
+async def _send_chart(message: Message, chart_task: asyncio.Task[bytes]) -> None:
+    try:
+        chart = await chart_task
+        photo = BufferedInputFile(chart, filename="weight.png")
+        await message.answer_photo(photo, caption="📈 График прогресса веса")
+    except Exception as e:
+        logger.warning(f"Не удалось отправить график веса: {e}", exc_info=True)
 
 
 async def show_report(message: Message, db: Database, tz: ZoneInfo, user_id: int, week_parity_offset: int) -> None:
@@ -22,50 +77,44 @@ async def show_report(message: Message, db: Database, tz: ZoneInfo, user_id: int
     now = datetime.now(tz)
     start, _ = month_range(now)
     report = await build_monthly_report(db, user_id, start, now, week_parity_offset)
-
-    start_weight_str = f"{report.start_weight:.1f} кг" if report.start_weight is not None else "нет данных"
-    end_weight_str = f"{report.end_weight:.1f} кг" if report.end_weight is not None else "нет данных"
-    diff_str = f"{report.diff:+.1f} кг" if report.diff is not None else "нет данных"
-    diff_percent_str = f"{report.diff_percent:+.1f}%" if report.diff_percent is not None else "нет данных"
-    
-    message_text = (
-        f"📊 <b>Месячный отчет</b>\n"
-        f"📅 Период: {start.strftime('%d.%m.%Y')} — {now.strftime('%d.%m.%Y')}\n\n"
-        f"⚖️ <b>Прогресс веса:</b>\n"
-        f"   • Стартовый вес: {start_weight_str}\n"
-        f"   • Текущий вес: {end_weight_str}\n"
-        f"   • Изменение: {diff_str} ({diff_percent_str})\n\n"
-        f"🏋️ <b>Тренировки:</b>\n"
-        f"   ✅ Выполнено: {report.completed}\n"
-        f"   ❌ Пропущено: {report.missed}\n\n"
-        f"📈 <b>Дисциплина: {report.discipline_score:.1f}%</b>"
+    # График рисуется в потоке, пока отправляется текст отчета
+    chart_task = asyncio.create_task(build_weight_chart(report.weights)) if report.weights else None
+
+    message_text = _REPORT_TMPL.format(
+        start=start,
+        end=now,
+        start_weight=f"{report.start_weight:.1f} кг" if report.start_weight is not None else _NO_DATA,
+        end_weight=f"{report.end_weight:.1f} кг" if report.end_weight is not None else _NO_DATA,
+        diff=f"{report.diff:+.1f} кг" if report.diff is not None else _NO_DATA,
+        diff_percent=f"{report.diff_percent:+.1f}%" if report.diff_percent is not None else _NO_DATA,
+        completed=report.completed,
+        missed=report.missed,
+        score=report.discipline_score,
     )
-    await message.answer(message_text)
-
-    if report.weights:
-        chart = await build_weight_chart(report.weights)
-        photo = BufferedInputFile(chart, filename="weight.png")
-        await message.answer_photo(photo, caption="📈 График прогресса веса")
-
+    # Предупреждение о низкой дисциплине уходит тем же сообщением
     if report.discipline_score < 70:
-        await message.answer(
-            "⚠️ <b>Внимание!</b>\n\n"
-            "Ваша дисциплина ниже 70%. Это зона риска.\n\n"
-            "💪 Верните регулярность тренировок немедленно!\n"
-            "Помните: стабильность — ключ к успеху."
-        )
+        message_text += "\n\n" + _REPORT_LOW_DISCIPLINE_TEXT
+    try:
+        await message.answer(message_text)
+    except BaseException:
+        # Текст не ушел — график не нужен; отмененную задачу не нужно дожидаться
+        if chart_task is not None:
+            chart_task.cancel()
+        raise
+
+    # График досылается в фоне: обработчик не ждёт отрисовки и загрузки фото
+    if chart_task is not None:
+        task = asyncio.create_task(_send_chart(message, chart_task))
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
 
 
 @router.message(Command("report"))
 async def report_command(message: Message, db: Database, tz: ZoneInfo) -> None:
     if message.from_user is None:
         return
-    user = await queries.get_user_by_tg_id(db, message.from_user.id)
-    if not user:
-        await message.answer(
-            "👋 Привет!\n\n"
-            "Для начала работы выполните команду /start"
-        )
+    user = await require_user(message, db)
+    if user is None:
         return
     week_parity_offset = int(user.get("week_parity_offset") or 0)
     await show_report(message, db, tz, int(user["id"]), week_parity_offset)
@@ -75,60 +124,50 @@ async def show_stats(message: Message, db: Database, tz: ZoneInfo, user_id: int,
     """Вспомогательная функция для показа статистики по user_id"""
     end = datetime.now(tz)
     start = end - timedelta(days=30)
-    stats = await queries.get_workout_stats(db, user_id, start, end)
-    schedule = await queries.get_workout_schedule(db, user_id)
+    # Независимые чтения идут параллельно на разных соединениях пула
+    stats, schedule, (latest_weight, weight_30_days_ago) = await asyncio.gather(
+        queries.get_workout_stats(db, user_id, start, end),
+        queries.get_workout_schedule(db, user_id),
+        # Текущий вес и вес 30 дней назад для сравнения
+        queries.get_stats_weights(db, user_id, start, end),
+    )
     scheduled = count_scheduled_workouts(schedule, start, end, week_parity_offset)
     score = calculate_discipline_score(stats["done"], scheduled)
 
     # Статистика веса
-    latest_weight = await queries.get_latest_weight(db, user_id)
     weight_value = latest_weight["weight"] if latest_weight else None
     
-    # Получаем вес 30 дней назад для сравнения
-    weight_30_days_ago = await queries.get_first_weight_between(db, user_id, start, end)
-    
-    weight_text = ""
     if weight_value is not None:
         weight_str = f"{weight_value:.1f} кг"
         if weight_30_days_ago:
             old_weight = float(weight_30_days_ago["weight"])
             diff = weight_value - old_weight
             diff_str = f"{diff:+.1f} кг" if diff != 0 else "0 кг"
-            weight_text = f"⚖️ <b>Вес:</b>\n   • Текущий: {weight_str}\n   • 30 дней назад: {old_weight:.1f} кг\n   • Изменение: {diff_str}"
+            weight_text = _STATS_WEIGHT_DIFF_TMPL.format(current=weight_str, old=old_weight, diff=diff_str)
         else:
-            weight_text = f"⚖️ <b>Текущий вес:</b> {weight_str}"
+            weight_text = _STATS_WEIGHT_TMPL.format(current=weight_str)
     else:
-        weight_text = "⚖️ <b>Вес:</b> нет данных"
+        weight_text = _STATS_NO_WEIGHT_TEXT
     
-    await message.answer(
-        f"📊 <b>Статистика за 30 дней</b>\n\n"
-        f"🏋️ <b>Тренировки:</b>\n"
-        f"   ✅ Выполнено: {stats['done']}\n"
-        f"   ❌ Пропущено: {stats['missed']}\n"
-        f"   📅 Запланировано: {scheduled}\n\n"
-        f"📈 <b>Дисциплина: {score:.1f}%</b>\n\n"
-        f"{weight_text}"
+    message_text = _STATS_TMPL.format(
+        done=stats["done"],
+        missed=stats["missed"],
+        scheduled=scheduled,
+        score=score,
+        weight=weight_text,
     )
-
+    # Предупреждение о низкой дисциплине уходит тем же сообщением
     if score < 70:
-        await message.answer(
-            "⚠️ <b>Внимание!</b>\n\n"
-            "Дисциплина ниже 70%.\n\n"
-            "💪 Стабильность — основа прогресса.\n"
-            "Исправляйтесь и возвращайтесь в ритм!"
-        )
+        message_text += "\n\n" + _STATS_LOW_DISCIPLINE_TEXT
+    await message.answer(message_text)
 
 
 @router.message(Command("stats"))
 async def stats_command(message: Message, db: Database, tz: ZoneInfo) -> None:
     if message.from_user is None:
         return
-    user = await queries.get_user_by_tg_id(db, message.from_user.id)
-    if not user:
-        await message.answer(
-            "👋 Привет!\n\n"
-            "Для начала работы выполните команду /start"
-        )
+    user = await require_user(message, db)
+    if user is None:
         return
     week_parity_offset = int(user.get("week_parity_offset") or 0)
     await show_stats(message, db, tz, int(user["id"]), week_parity_offset)
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 from datetime import datetime
+from typing import Any, Awaitable
 from zoneinfo import ZoneInfo
 
 from aiogram import Router, F
@@ -15,14 +17,45 @@ logger = logging.getLogger(__name__)
 from app.db.database import Database
 from app.db import queries
 from app.db.models import ScheduleCreate
+from app.handlers.common import require_user
 from app.scheduler import schedule_user_jobs
 from app.services.discipline import compute_week_parity_offset
-from app.utils.keyboards import weekdays_kb, week_parity_kb, schedule_mode_kb, main_menu_kb, time_mode_kb
-from app.utils.parsing import parse_time, format_schedule
+from app.utils.keyboards import weekdays_kb, week_parity_markup, schedule_mode_markup, main_menu_markup, time_mode_markup
+from app.utils.parsing import WEEKDAYS_RU, parse_time, format_schedule, render_schedule_sections
 
 
 router = Router()
 
+# Подписи типов недель для текстов настройки расписания
+_WEEK_TYPE_TEXT = {"even": "четных недель", "odd": "нечетных недель", "any": "всех недель"}
+_WEEK_TYPE_LABEL = {"even": "четных", "odd": "нечетных", "any": "всех"}
+
+_SESSION_RESET_TEXT = "⚠️ Сессия сброшена.\n\nПожалуйста, нажмите /schedule для настройки расписания."
+_TIME_FORMAT_ERROR_TEXT = (
+    "❌ <b>Неверный формат времени</b>\n\n"
+    "Пожалуйста, укажите время в формате:\n"
+    "<code>HH:MM</code>\n\n"
+    "Примеры:\n"
+    "• <code>19:30</code>\n"
+    "• <code>08:00</code>\n"
+    "• <code>20:15</code>"
+)
+# Запросы времени в режиме "разное время для каждого дня"
+_FIRST_DAY_TIME_TMPL = (
+    "⏰ <b>Настройка времени для каждого дня</b>\n\n"
+    "📅 День <b>1 из {total}</b>: <b>{day}</b>\n\n"
+    "Укажите время тренировки:\n"
+    "Формат: <code>HH:MM</code>\n"
+    "Пример: <code>19:30</code>"
+)
+_NEXT_DAY_TIME_TMPL = (
+    "✅ <b>Время для {prev} сохранено:</b> {time}\n\n"
+    "📅 День <b>{index} из {total}</b>: <b>{day}</b>\n\n"
+    "⏰ <b>Укажите время тренировки</b>\n"
+    "Формат: <code>HH:MM</code>\n"
+    "Пример: <code>19:30</code>"
+)
+
 
 class ScheduleStates(StatesGroup):
     waiting_mode = State()
@@ -37,40 +70,13 @@ class ScheduleStates(StatesGroup):
 async def schedule_command(message: Message, state: FSMContext, db: Database, tz: ZoneInfo) -> None:
     if message.from_user is None:
         return
-    user = await queries.get_user_by_tg_id(db, message.from_user.id)
-    if not user:
-        await message.answer(
-            "👋 Привет!\n\n"
-            "Для начала работы выполните команду /start"
-        )
+    user = await require_user(message, db)
+    if user is None:
         return
     
     # Показываем текущее расписание раздельно для четных и нечетных
     current_schedule = await queries.get_workout_schedule(db, int(user["id"]))
-    
-    even_schedule = [s for s in current_schedule if s.get("week_type") == "even"]
-    odd_schedule = [s for s in current_schedule if s.get("week_type") == "odd"]
-    any_schedule = [s for s in current_schedule if s.get("week_type") == "any"]
-    
-    # Формируем красиво оформленный текст с абзацами
-    schedule_parts = []
-    
-    if even_schedule:
-        formatted = format_schedule(even_schedule, include_week_type=False)
-        schedule_parts.append(f"📅 <b>Четные недели:</b>\n{formatted}")
-    
-    if odd_schedule:
-        formatted = format_schedule(odd_schedule, include_week_type=False)
-        schedule_parts.append(f"📅 <b>Нечетные недели:</b>\n{formatted}")
-    
-    if any_schedule:
-        formatted = format_schedule(any_schedule, include_week_type=False)
-        schedule_parts.append(f"📅 <b>Все недели:</b>\n{formatted}")
-    
-    if not schedule_parts:
-        schedule_text = "⚠️ Расписание не настроено"
-    else:
-        schedule_text = "\n\n".join(schedule_parts)
+    schedule_text = render_schedule_sections(current_schedule)
     
     await state.update_data(user_id=int(user["id"]))
     await state.set_state(ScheduleStates.waiting_mode)
@@ -78,7 +84,7 @@ async def schedule_command(message: Message, state: FSMContext, db: Database, tz
         f"📋 <b>Управление расписанием</b>\n\n"
         f"{schedule_text}\n\n"
         f"<b>Выберите действие:</b>",
-        reply_markup=schedule_mode_kb().as_markup(),
+        reply_markup=schedule_mode_markup(),
     )
 
 
@@ -86,7 +92,7 @@ async def schedule_command(message: Message, state: FSMContext, db: Database, tz
 async def schedule_mode(query, state: FSMContext, db: Database) -> None:
     if query.data is None or query.message is None:
         return
-    mode = query.data.split(":")[1]
+    _, _, mode = query.data.partition(":")
     
     if mode == "view":
         # Показываем расписание
@@ -94,34 +100,11 @@ async def schedule_mode(query, state: FSMContext, db: Database) -> None:
         user_id = data.get("user_id")
         if user_id:
             current_schedule = await queries.get_workout_schedule(db, int(user_id))
-            even_schedule = [s for s in current_schedule if s.get("week_type") == "even"]
-            odd_schedule = [s for s in current_schedule if s.get("week_type") == "odd"]
-            any_schedule = [s for s in current_schedule if s.get("week_type") == "any"]
-            
-            # Формируем красиво оформленный текст с абзацами
-            schedule_parts = []
-            
-            if even_schedule:
-                formatted = format_schedule(even_schedule, include_week_type=False)
-                schedule_parts.append(f"📅 <b>Четные недели:</b>\n{formatted}")
-            else:
-                schedule_parts.append(f"📅 <b>Четные недели:</b>\n⚠️ не настроено")
-            
-            if odd_schedule:
-                formatted = format_schedule(odd_schedule, include_week_type=False)
-                schedule_parts.append(f"📅 <b>Нечетные недели:</b>\n{formatted}")
-            else:
-                schedule_parts.append(f"📅 <b>Нечетные недели:</b>\n⚠️ не настроено")
-            
-            if any_schedule:
-                formatted = format_schedule(any_schedule, include_week_type=False)
-                schedule_parts.append(f"📅 <b>Все недели:</b>\n{formatted}")
-            
-            schedule_text = "\n\n".join(schedule_parts)
+            schedule_text = render_schedule_sections(current_schedule, show_empty=True)
             
             await query.message.edit_text(
                 f"📋 <b>Ваше расписание</b>\n\n{schedule_text}",
-                reply_markup=main_menu_kb().as_markup(),
+                reply_markup=main_menu_markup(),
             )
             await query.answer()
             await state.clear()
@@ -135,11 +118,10 @@ async def schedule_mode(query, state: FSMContext, db: Database) -> None:
     data = await state.get_data()
     user_id = data.get("user_id")
     if user_id:
-        current_schedule = await queries.get_workout_schedule(db, int(user_id))
-        current_for_type = [s for s in current_schedule if s.get("week_type") == mode]
+        current_for_type = await queries.get_workout_schedule_by_type(db, int(user_id), mode)
         if current_for_type:
             current_formatted = format_schedule(current_for_type)
-            week_type_label = "четных" if mode == "even" else "нечетных" if mode == "odd" else "всех"
+            week_type_label = _WEEK_TYPE_LABEL[mode]
             await query.message.edit_text(
                 f"📅 <b>Текущее расписание для {week_type_label} недель:</b>\n{current_formatted}\n\n"
                 "⚠️ <b>Внимание!</b> При настройке новое расписание заменит текущее.\n\n"
@@ -148,11 +130,7 @@ async def schedule_mode(query, state: FSMContext, db: Database) -> None:
                 reply_markup=weekdays_kb([]).as_markup(),
             )
         else:
-            week_type_text = {
-                "even": "четных недель",
-                "odd": "нечетных недель",
-                "any": "всех недель"
-            }.get(mode, "недель")
+            week_type_text = _WEEK_TYPE_TEXT.get(mode, "недель")
             await query.message.edit_text(
                 f"📅 <b>Настройка расписания для {week_type_text}</b>\n\n"
                 "📅 <b>Выберите дни тренировок</b>\n"
@@ -160,11 +138,7 @@ async def schedule_mode(query, state: FSMContext, db: Database) -> None:
                 reply_markup=weekdays_kb([]).as_markup(),
             )
     else:
-        week_type_text = {
-            "even": "четных недель",
-            "odd": "нечетных недель",
-            "any": "всех недель"
-        }.get(mode, "недель")
+        week_type_text = _WEEK_TYPE_TEXT.get(mode, "недель")
         await query.message.edit_text(
             f"📅 <b>Настройка расписания для {week_type_text}</b>\n\n"
             "📅 <b>Выберите дни тренировок</b>\n"
@@ -172,7 +146,8 @@ async def schedule_mode(query, state: FSMContext, db: Database) -> None:
             reply_markup=weekdays_kb([]).as_markup(),
         )
     
-    await state.update_data(week_type=mode, days=[])
+    # Время из прошлой, брошенной на полпути настройки не должно попасть в новое расписание
+    await state.update_data(week_type=mode, days=[], day_times=None, time_str=None)
     await state.set_state(ScheduleStates.waiting_days)
     await query.answer()
 
@@ -185,14 +160,16 @@ async def schedule_days(query, state: FSMContext) -> None:
         return
     data = await state.get_data()
     selected_days = list(data.get("days", []))
-    action = query.data.split(":")[1]
+    _, _, payload = query.data.partition(":")
+    action, _, day_str = payload.partition(":")
 
     if action == "toggle":
-        day = int(query.data.split(":")[2])
+        day = int(day_str)
         if day in selected_days:
             selected_days.remove(day)
         else:
             selected_days.append(day)
+        # Дни в состоянии всегда хранятся отсортированными — дальше их не пересортировываем
         selected_days = sorted(set(selected_days))
         await state.update_data(days=selected_days)
         await query.message.edit_reply_markup(reply_markup=weekdays_kb(selected_days).as_markup())
@@ -210,11 +187,11 @@ async def schedule_days(query, state: FSMContext) -> None:
             await query.answer("⚠️ Пожалуйста, выберите хотя бы один день", show_alert=True)
             return
         await state.set_state(ScheduleStates.waiting_time_mode)
-        selected_days_text = ", ".join(["Пн", "Вт", "Ср", "Чт", "Пт", "Сб", "Вс"][d] for d in sorted(selected_days))
+        selected_days_text = ", ".join(WEEKDAYS_RU[d] for d in selected_days)
         await query.message.edit_text(
             f"✅ <b>Выбраны дни:</b> {selected_days_text}\n\n"
             "⏰ <b>Выберите режим настройки времени:</b>",
-            reply_markup=time_mode_kb().as_markup(),
+            reply_markup=time_mode_markup(),
         )
         await query.answer()
 
@@ -223,14 +200,14 @@ async def schedule_days(query, state: FSMContext) -> None:
 async def schedule_time_mode(query, state: FSMContext) -> None:
     if query.data is None or query.message is None:
         return
-    time_mode = query.data.split(":")[1]
+    _, _, time_mode = query.data.partition(":")
     data = await state.get_data()
     days = data.get("days", [])
     
     if time_mode == "single":
         # Одно время для всех дней
         await state.set_state(ScheduleStates.waiting_time)
-        selected_days_text = ", ".join(["Пн", "Вт", "Ср", "Чт", "Пт", "Сб", "Вс"][d] for d in sorted(days))
+        selected_days_text = ", ".join(WEEKDAYS_RU[d] for d in days)
         await query.message.edit_text(
             f"✅ <b>Выбраны дни:</b> {selected_days_text}\n\n"
             "⏰ <b>Укажите время тренировки</b>\n"
@@ -241,16 +218,13 @@ async def schedule_time_mode(query, state: FSMContext) -> None:
         await query.answer()
     elif time_mode == "multiple":
         # Разное время для каждого дня
-        await state.update_data(day_times={}, current_day_index=0)
+        # Время по дням — список по индексу дня в days
+        await state.update_data(day_times=[None] * len(days), current_day_index=0)
         await state.set_state(ScheduleStates.waiting_day_time)
-        first_day = sorted(days)[0]
-        day_name = ["Пн", "Вт", "Ср", "Чт", "Пт", "Сб", "Вс"][first_day]
+        first_day = days[0]
+        day_name = WEEKDAYS_RU[first_day]
         await query.message.edit_text(
-            f"⏰ <b>Настройка времени для каждого дня</b>\n\n"
-            f"📅 День <b>1 из {len(days)}</b>: <b>{day_name}</b>\n\n"
-            "Укажите время тренировки:\n"
-            "Формат: <code>HH:MM</code>\n"
-            "Пример: <code>19:30</code>",
+            _FIRST_DAY_TIME_TMPL.format(total=len(days), day=day_name),
             reply_markup=None,
         )
         await query.answer()
@@ -274,54 +248,36 @@ async def schedule_time(
     week_type = data.get("week_type", "any")
     if user_id is None:
         await state.clear()
-        await message.answer(
-            "⚠️ Сессия сброшена.\n\n"
-            "Пожалуйста, нажмите /schedule для настройки расписания."
-        )
+        await message.answer(_SESSION_RESET_TEXT)
         return
     try:
         time_str = parse_time(message.text)
     except ValueError:
-        await message.answer(
-            "❌ <b>Неверный формат времени</b>\n\n"
-            "Пожалуйста, укажите время в формате:\n"
-            "<code>HH:MM</code>\n\n"
-            "Примеры:\n"
-            "• <code>19:30</code>\n"
-            "• <code>08:00</code>\n"
-            "• <code>20:15</code>"
-        )
+        await message.answer(_TIME_FORMAT_ERROR_TEXT)
         return
 
     # Если это "any" (все недели), не нужно спрашивать про четность
     if week_type == "any":
         await queries.update_week_parity_offset(db, int(user_id), 0)
-        # Удаляем старое расписание для этого типа недель
-        await db.execute(
-            "DELETE FROM workout_schedule WHERE user_id = ? AND week_type = ?;",
-            (int(user_id), "any")
-        )
+        # Заменяем старое расписание для этого типа недель
         schedules = [
             ScheduleCreate(user_id=int(user_id), weekday=day, time=time_str, week_type=week_type)
             for day in days
         ]
-        for entry in schedules:
-            await queries.add_workout_schedule(db, entry)
+        schedule = await queries.replace_week_type_schedule(db, int(user_id), "any", [entry.to_row() for entry in schedules])
     else:
         # Для четных/нечетных нужно знать текущую неделю для синхронизации
         await state.update_data(time_str=time_str)
         await state.set_state(ScheduleStates.waiting_week_parity)
-        week_type_text = "четных" if week_type == "even" else "нечетных"
+        week_type_text = _WEEK_TYPE_LABEL[week_type]
         await message.answer(
             f"📅 <b>Настройка расписания для {week_type_text} недель</b>\n\n"
             "📆 <b>Какая сейчас неделя по вашему графику?</b>\n"
             "(Это нужно для правильной синхронизации)",
-            reply_markup=week_parity_kb().as_markup(),
+            reply_markup=week_parity_markup(),
         )
         return
     
-    # Сохраняем расписание для "any"
-    schedule = await queries.get_workout_schedule(db, int(user_id))
     schedule_user_jobs(
         scheduler,
         db,
@@ -335,33 +291,22 @@ async def schedule_time(
     await state.clear()
     
     # Показываем обновленное расписание
-    even_schedule = [s for s in schedule if s.get("week_type") == "even"]
-    odd_schedule = [s for s in schedule if s.get("week_type") == "odd"]
-    any_schedule = [s for s in schedule if s.get("week_type") == "any"]
-    
-    # Формируем красиво оформленный текст с абзацами
-    schedule_parts = []
-    
-    if even_schedule:
-        formatted = format_schedule(even_schedule, include_week_type=False)
-        schedule_parts.append(f"📅 <b>Четные недели:</b>\n{formatted}")
-    
-    if odd_schedule:
-        formatted = format_schedule(odd_schedule, include_week_type=False)
-        schedule_parts.append(f"📅 <b>Нечетные недели:</b>\n{formatted}")
-    
-    if any_schedule:
-        formatted = format_schedule(any_schedule, include_week_type=False)
-        schedule_parts.append(f"📅 <b>Все недели:</b>\n{formatted}")
-    
-    schedule_text = "\n\n".join(schedule_parts) if schedule_parts else "⚠️ Расписание не настроено"
+    schedule_text = render_schedule_sections(schedule)
     
     await message.answer(
         f"✅ <b>Расписание обновлено!</b>\n\n{schedule_text}",
-        reply_markup=main_menu_kb().as_markup(),
+        reply_markup=main_menu_markup(),
     )
 
 
+async def _ignore_errors(call: Awaitable[Any]) -> None:
+    """Выполнить вызов Telegram API, для которого ошибка не важна (удаление сообщений)."""
+    try:
+        await call
+    except Exception:
+        pass
+
+
 @router.message(ScheduleStates.waiting_day_time)
 async def schedule_day_time(
     message: Message,
@@ -374,57 +319,38 @@ async def schedule_day_time(
         return
     data = await state.get_data()
     user_id = data.get("user_id")
-    days = sorted(data.get("days", []))
+    days = data.get("days", [])
     week_type = data.get("week_type", "any")
-    day_times = data.get("day_times", {})
+    day_times = list(data.get("day_times") or [None] * len(days))
     current_day_index = data.get("current_day_index", 0)
     
     if user_id is None or not days:
         await state.clear()
-        await message.answer(
-            "⚠️ Сессия сброшена.\n\n"
-            "Пожалуйста, нажмите /schedule для настройки расписания."
-        )
+        await message.answer(_SESSION_RESET_TEXT)
         return
     
-    # Удаляем сообщение пользователя
-    try:
-        await message.delete()
-    except Exception:
-        pass
+    # Удаляем сообщение пользователя параллельно с остальной обработкой (ответ ждать не нужно)
+    delete_task = asyncio.create_task(_ignore_errors(message.delete()))
     
     try:
         time_str = parse_time(message.text)
     except ValueError:
-        await message.answer(
-            "❌ <b>Неверный формат времени</b>\n\n"
-            "Пожалуйста, укажите время в формате:\n"
-            "<code>HH:MM</code>\n\n"
-            "Примеры:\n"
-            "• <code>19:30</code>\n"
-            "• <code>08:00</code>\n"
-            "• <code>20:15</code>"
-        )
+        await asyncio.gather(delete_task, message.answer(_TIME_FORMAT_ERROR_TEXT))
         return
     
     # Сохраняем время для текущего дня
     current_day = days[current_day_index]
-    day_times[current_day] = time_str
-    await state.update_data(day_times=day_times)
+    day_times[current_day_index] = time_str
     
     # Переходим к следующему дню
     next_index = current_day_index + 1
     if next_index < len(days):
-        await state.update_data(current_day_index=next_index)
+        await state.update_data(day_times=day_times, current_day_index=next_index)
         next_day = days[next_index]
-        day_name = ["Пн", "Вт", "Ср", "Чт", "Пт", "Сб", "Вс"][next_day]
+        day_name = WEEKDAYS_RU[next_day]
         last_bot_message_id = data.get("last_bot_message_id")
-        text = (
-            f"✅ <b>Время для {['Пн','Вт','Ср','Чт','Пт','Сб','Вс'][current_day]} сохранено:</b> {time_str}\n\n"
-            f"📅 День <b>{next_index + 1} из {len(days)}</b>: <b>{day_name}</b>\n\n"
-            "⏰ <b>Укажите время тренировки</b>\n"
-            "Формат: <code>HH:MM</code>\n"
-            "Пример: <code>19:30</code>"
+        text = _NEXT_DAY_TIME_TMPL.format(
+            prev=WEEKDAYS_RU[current_day], time=time_str, index=next_index + 1, total=len(days), day=day_name
         )
         # Редактируем последнее сообщение бота или отправляем новое
         if last_bot_message_id:
@@ -441,35 +367,32 @@ async def schedule_day_time(
         else:
             msg = await message.answer(text)
             await state.update_data(last_bot_message_id=msg.message_id)
+        await delete_task
         return
     
     # Все дни настроены, сохраняем расписание
-    await state.update_data(time_str="multiple")  # Маркер для множественного времени
+    await state.update_data(day_times=day_times, time_str="multiple")  # Маркер для множественного времени
     
-    # Удаляем последнее сообщение бота, если есть
+    # Удаляем последнее сообщение бота, если есть (тоже параллельно)
+    cleanup = [delete_task]
     last_bot_message_id = data.get("last_bot_message_id")
     if last_bot_message_id:
-        try:
-            await message.bot.delete_message(chat_id=message.chat.id, message_id=last_bot_message_id)
-        except Exception:
-            pass
+        cleanup.append(
+            asyncio.create_task(
+                _ignore_errors(message.bot.delete_message(chat_id=message.chat.id, message_id=last_bot_message_id))
+            )
+        )
     
     # Если это "any" (все недели), не нужно спрашивать про четность
     if week_type == "any":
         await queries.update_week_parity_offset(db, int(user_id), 0)
-        # Удаляем старое расписание для этого типа недель
-        await db.execute(
-            "DELETE FROM workout_schedule WHERE user_id = ? AND week_type = ?;",
-            (int(user_id), "any")
-        )
+        # Заменяем старое расписание для этого типа недель
         schedules = [
-            ScheduleCreate(user_id=int(user_id), weekday=day, time=day_times[day], week_type=week_type)
-            for day in days
+            ScheduleCreate(user_id=int(user_id), weekday=day, time=day_time, week_type=week_type)
+            for day, day_time in zip(days, day_times)
         ]
-        for entry in schedules:
-            await queries.add_workout_schedule(db, entry)
+        schedule = await queries.replace_week_type_schedule(db, int(user_id), "any", [entry.to_row() for entry in schedules])
         
-        schedule = await queries.get_workout_schedule(db, int(user_id))
         schedule_user_jobs(
             scheduler,
             db,
@@ -483,42 +406,24 @@ async def schedule_day_time(
         await state.clear()
         
         # Показываем обновленное расписание
-        even_schedule = [s for s in schedule if s.get("week_type") == "even"]
-        odd_schedule = [s for s in schedule if s.get("week_type") == "odd"]
-        any_schedule = [s for s in schedule if s.get("week_type") == "any"]
-        
-        # Формируем красиво оформленный текст с абзацами
-        schedule_parts = []
-        
-        if even_schedule:
-            formatted = format_schedule(even_schedule, include_week_type=False)
-            schedule_parts.append(f"📅 <b>Четные недели:</b>\n{formatted}")
-        
-        if odd_schedule:
-            formatted = format_schedule(odd_schedule, include_week_type=False)
-            schedule_parts.append(f"📅 <b>Нечетные недели:</b>\n{formatted}")
-        
-        if any_schedule:
-            formatted = format_schedule(any_schedule, include_week_type=False)
-            schedule_parts.append(f"📅 <b>Все недели:</b>\n{formatted}")
-        
-        schedule_text = "\n\n".join(schedule_parts) if schedule_parts else "⚠️ Расписание не настроено"
+        schedule_text = render_schedule_sections(schedule)
         
         await message.answer(
             f"✅ <b>Расписание обновлено!</b>\n\n{schedule_text}",
-            reply_markup=main_menu_kb().as_markup(),
+            reply_markup=main_menu_markup(),
         )
     else:
         # Для четных/нечетных нужно знать текущую неделю для синхронизации
         await state.set_state(ScheduleStates.waiting_week_parity)
-        week_type_text = "четных" if week_type == "even" else "нечетных"
+        week_type_text = _WEEK_TYPE_LABEL[week_type]
         await message.answer(
             f"✅ <b>Время для всех дней сохранено!</b>\n\n"
             f"📅 <b>Настройка расписания для {week_type_text} недель</b>\n\n"
             "📆 <b>Какая сейчас неделя по вашему графику?</b>\n"
             "(Это нужно для правильной синхронизации)",
-            reply_markup=week_parity_kb().as_markup(),
+            reply_markup=week_parity_markup(),
         )
+    await asyncio.gather(*cleanup)
 
 
 @router.callback_query(ScheduleStates.waiting_week_parity, F.data.startswith("weekparity:"))
@@ -528,10 +433,11 @@ async def schedule_week_parity(
     db: Database,
     scheduler,
     tz: ZoneInfo,
+    now: datetime,
 ) -> None:
     if query.data is None or query.message is None or query.from_user is None:
         return
-    parity = query.data.split(":")[1]
+    _, _, parity = query.data.partition(":")
     if parity not in {"even", "odd"}:
         await query.answer("❌ Неверный выбор", show_alert=True)
         return
@@ -540,41 +446,29 @@ async def schedule_week_parity(
     user_id = data.get("user_id")
     days = data.get("days", [])
     time_str = data.get("time_str")
-    day_times = data.get("day_times", {})
+    day_times = data.get("day_times") or []
     week_type = data.get("week_type", "any")
     if user_id is None or not days:
         await state.clear()
-        await query.message.answer(
-            "⚠️ Сессия сброшена.\n\n"
-            "Пожалуйста, нажмите /schedule для настройки расписания."
-        )
+        await query.message.answer(_SESSION_RESET_TEXT)
         return
     
     # Проверяем, что есть либо одно время, либо множественное время
     if not time_str and not day_times:
         await state.clear()
-        await query.message.answer(
-            "⚠️ Сессия сброшена.\n\n"
-            "Пожалуйста, нажмите /schedule для настройки расписания."
-        )
+        await query.message.answer(_SESSION_RESET_TEXT)
         return
 
     is_even_week = parity == "even"
-    offset = compute_week_parity_offset(datetime.now(tz), is_even_week)
+    offset = compute_week_parity_offset(now, is_even_week)
     await queries.update_week_parity_offset(db, int(user_id), offset)
 
-    # Удаляем старое расписание для этого типа недель
-    await db.execute(
-        "DELETE FROM workout_schedule WHERE user_id = ? AND week_type = ?;",
-        (int(user_id), week_type)
-    )
-    
-    # Добавляем новое расписание
+    # Новое расписание заменяет старое для этого типа недель
     if day_times:
         # Множественное время для разных дней
         schedules = [
-            ScheduleCreate(user_id=int(user_id), weekday=day, time=day_times[day], week_type=week_type)
-            for day in days if day in day_times
+            ScheduleCreate(user_id=int(user_id), weekday=day, time=day_time, week_type=week_type)
+            for day, day_time in zip(days, day_times) if day_time is not None
         ]
     else:
         # Одно время для всех дней
@@ -582,10 +476,8 @@ async def schedule_week_parity(
             ScheduleCreate(user_id=int(user_id), weekday=day, time=time_str, week_type=week_type)
             for day in days
         ]
-    for entry in schedules:
-        await queries.add_workout_schedule(db, entry)
+    schedule = await queries.replace_week_type_schedule(db, int(user_id), week_type, [entry.to_row() for entry in schedules])
 
-    schedule = await queries.get_workout_schedule(db, int(user_id))
     schedule_user_jobs(
         scheduler,
         db,
@@ -600,30 +492,11 @@ async def schedule_week_parity(
     await state.clear()
     
     # Показываем обновленное расписание
-    even_schedule = [s for s in schedule if s.get("week_type") == "even"]
-    odd_schedule = [s for s in schedule if s.get("week_type") == "odd"]
-    any_schedule = [s for s in schedule if s.get("week_type") == "any"]
-    
-    # Формируем красиво оформленный текст с абзацами
-    schedule_parts = []
-    
-    if even_schedule:
-        formatted = format_schedule(even_schedule, include_week_type=False)
-        schedule_parts.append(f"📅 <b>Четные недели:</b>\n{formatted}")
-    
-    if odd_schedule:
-        formatted = format_schedule(odd_schedule, include_week_type=False)
-        schedule_parts.append(f"📅 <b>Нечетные недели:</b>\n{formatted}")
-    
-    if any_schedule:
-        formatted = format_schedule(any_schedule, include_week_type=False)
-        schedule_parts.append(f"📅 <b>Все недели:</b>\n{formatted}")
-    
-    schedule_text = "\n\n".join(schedule_parts) if schedule_parts else "⚠️ Расписание не настроено"
+    schedule_text = render_schedule_sections(schedule)
     
     await query.message.edit_reply_markup(reply_markup=None)
     await query.message.answer(
         f"✅ <b>Расписание обновлено!</b>\n\n{schedule_text}",
-        reply_markup=main_menu_kb().as_markup(),
+        reply_markup=main_menu_markup(),
     )
     await query.answer()
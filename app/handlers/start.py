@@ -21,15 +21,15 @@ from app.scheduler import schedule_user_jobs
 from app.services.discipline import compute_week_parity_offset
 from app.utils.keyboards import (
     weekdays_kb,
-    week_parity_kb,
-    main_menu_kb,
-    time_mode_kb,
-    gender_kb,
-    activity_kb,
-    goal_kb,
+    week_parity_markup,
+    main_menu_markup,
+    time_mode_markup,
+    gender_markup,
+    activity_markup,
+    goal_markup,
 )
 from aiogram.utils.keyboard import InlineKeyboardBuilder
-from app.utils.parsing import parse_weight, parse_time, parse_height_cm, parse_birth_year, format_schedule
+from app.utils.parsing import WEEKDAYS_RU, parse_weight, parse_time, parse_height_cm, parse_birth_year, format_schedule, split_by_week_type
 from app.db.models import WeightEntry
 from app.services.access import has_access, PRODUCT_DESCRIPTION, get_product_price_text
 from app.utils.keyboards import paywall_kb
@@ -97,7 +97,7 @@ async def start_command(message: Message, state: FSMContext, db: Database, tz: Z
             "👋 <b>Вы уже зарегистрированы!</b>\n\n"
             "Используйте /schedule для настройки расписания\n"
             "Используйте /profile для просмотра профиля",
-            reply_markup=main_menu_kb(config.admin_ids, message.from_user.id).as_markup(),
+            reply_markup=main_menu_markup(config.admin_ids, message.from_user.id),
         )
         return
     
@@ -208,7 +208,7 @@ async def start_birth_year(message: Message, state: FSMContext, db: Database) ->
     await message.answer(
         f"✅ <b>Год рождения сохранён</b>\n\n"
         "📝 <b>Шаг 4 из 8:</b> Укажите <b>пол</b>",
-        reply_markup=gender_kb().as_markup(),
+        reply_markup=gender_markup(),
     )
 
 
@@ -228,7 +228,7 @@ async def start_gender(query, state: FSMContext, db: Database) -> None:
     await query.message.edit_text(
         "✅ <b>Пол сохранён</b>\n\n"
         "📝 <b>Шаг 5 из 8:</b> Выберите <b>уровень активности</b>",
-        reply_markup=activity_kb().as_markup(),
+        reply_markup=activity_markup(),
     )
     await query.answer()
 
@@ -249,7 +249,7 @@ async def start_activity(query, state: FSMContext, db: Database) -> None:
     await query.message.edit_text(
         "✅ <b>Активность сохранена</b>\n\n"
         "📝 <b>Шаг 6 из 8:</b> Выберите <b>цель</b>",
-        reply_markup=goal_kb().as_markup(),
+        reply_markup=goal_markup(),
     )
     await query.answer()
 
@@ -346,7 +346,7 @@ async def start_setup_choice(query, state: FSMContext, config: Config) -> None:
         await query.message.answer(
             "✅ <b>Регистрация завершена!</b>\n\n"
             "Настройте расписание через /schedule, профиль — /profile.",
-            reply_markup=main_menu_kb(config.admin_ids, query.from_user.id).as_markup(),
+            reply_markup=main_menu_markup(config.admin_ids, query.from_user.id),
         )
         await query.answer()
         await state.clear()
@@ -408,12 +408,12 @@ async def start_even_days(query, state: FSMContext) -> None:
             await query.answer("⚠️ Пожалуйста, выберите хотя бы один день", show_alert=True)
             return
         await state.set_state(StartStates.waiting_even_time_mode)
-        selected_days_text = ", ".join(["Пн", "Вт", "Ср", "Чт", "Пт", "Сб", "Вс"][d] for d in sorted(selected_days))
+        selected_days_text = ", ".join(WEEKDAYS_RU[d] for d in sorted(selected_days))
         await query.message.edit_text(
             f"📅 <b>Четные недели</b>\n"
             f"✅ Выбраны дни: <b>{selected_days_text}</b>\n\n"
             "⏰ <b>Выберите режим настройки времени:</b>",
-            reply_markup=time_mode_kb().as_markup(),
+            reply_markup=time_mode_markup(),
         )
         await query.answer()
 
@@ -430,7 +430,7 @@ async def start_even_time_mode(query, state: FSMContext) -> None:
         # Одно время для всех дней
         await state.update_data(even_time_mode="single")
         await state.set_state(StartStates.waiting_even_time)
-        selected_days_text = ", ".join(["Пн", "Вт", "Ср", "Чт", "Пт", "Сб", "Вс"][d] for d in sorted(even_days))
+        selected_days_text = ", ".join(WEEKDAYS_RU[d] for d in sorted(even_days))
         await query.message.edit_text(
             f"📅 <b>Четные недели</b>\n"
             f"✅ Выбраны дни: <b>{selected_days_text}</b>\n\n"
@@ -443,7 +443,7 @@ async def start_even_time_mode(query, state: FSMContext) -> None:
     elif time_mode == "multiple":
         # Разное время для каждого дня
         first_day = sorted(even_days)[0]
-        day_name = ["Пн", "Вт", "Ср", "Чт", "Пт", "Сб", "Вс"][first_day]
+        day_name = WEEKDAYS_RU[first_day]
         msg = await query.message.edit_text(
             f"⏰ <b>Настройка времени для каждого дня (четные недели)</b>\n\n"
             f"📅 День <b>1 из {len(even_days)}</b>: <b>{day_name}</b>\n\n"
@@ -498,7 +498,7 @@ async def start_even_time(message: Message, state: FSMContext, db: Database, sch
     await state.set_state(StartStates.waiting_odd_days)
     await message.answer(
         f"✅ <b>Расписание для четных недель сохранено:</b>\n"
-        f"{', '.join(['Пн','Вт','Ср','Чт','Пт','Сб','Вс'][d] for d in sorted(even_days))} в <b>{time_str}</b>\n\n"
+        f"{', '.join(WEEKDAYS_RU[d] for d in sorted(even_days))} в <b>{time_str}</b>\n\n"
         "📅 <b>Теперь настройте расписание для НЕЧЕТНЫХ недель</b>\n\n"
         "📅 <b>Выберите дни тренировок</b>\n"
         "Нажимайте на дни для выбора, затем нажмите \"Готово\".",
@@ -555,9 +555,9 @@ async def start_even_day_time(message: Message, state: FSMContext, db: Database,
     if next_index < len(even_days):
         await state.update_data(even_current_day_index=next_index)
         next_day = even_days[next_index]
-        day_name = ["Пн", "Вт", "Ср", "Чт", "Пт", "Сб", "Вс"][next_day]
+        day_name = WEEKDAYS_RU[next_day]
         text = (
-            f"✅ <b>Время для {['Пн','Вт','Ср','Чт','Пт','Сб','Вс'][current_day]} сохранено:</b> {time_str}\n\n"
+            f"✅ <b>Время для {WEEKDAYS_RU[current_day]} сохранено:</b> {time_str}\n\n"
             f"📅 День <b>{next_index + 1} из {len(even_days)}</b>: <b>{day_name}</b>\n\n"
             "⏰ <b>Укажите время тренировки</b>\n"
             "Формат: <code>HH:MM</code>\n"
@@ -583,7 +583,7 @@ async def start_even_day_time(message: Message, state: FSMContext, db: Database,
     # Все дни настроены, переходим к нечетным неделям
     await state.update_data(even_time_mode="multiple", odd_days=[])
     await state.set_state(StartStates.waiting_odd_days)
-    schedule_text = ", ".join([f"{['Пн','Вт','Ср','Чт','Пт','Сб','Вс'][d]} {even_day_times[d]}" for d in sorted(even_days)])
+    schedule_text = ", ".join([f"{WEEKDAYS_RU[d]} {even_day_times[d]}" for d in sorted(even_days)])
     # Удаляем последнее сообщение бота, если есть
     if last_bot_message_id:
         try:
@@ -630,12 +630,12 @@ async def start_odd_days(query, state: FSMContext) -> None:
             await query.answer("⚠️ Пожалуйста, выберите хотя бы один день", show_alert=True)
             return
         await state.set_state(StartStates.waiting_odd_time_mode)
-        selected_days_text = ", ".join(["Пн", "Вт", "Ср", "Чт", "Пт", "Сб", "Вс"][d] for d in sorted(selected_days))
+        selected_days_text = ", ".join(WEEKDAYS_RU[d] for d in sorted(selected_days))
         await query.message.edit_text(
             f"📅 <b>Настройка расписания для НЕЧЕТНЫХ недель</b>\n"
             f"✅ Выбраны дни: <b>{selected_days_text}</b>\n\n"
             "⏰ <b>Выберите режим настройки времени:</b>",
-            reply_markup=time_mode_kb().as_markup(),
+            reply_markup=time_mode_markup(),
         )
         await query.answer()
 
@@ -651,7 +651,7 @@ async def start_odd_time_mode(query, state: FSMContext) -> None:
     if time_mode == "single":
         # Одно время для всех дней
         await state.set_state(StartStates.waiting_odd_time)
-        selected_days_text = ", ".join(["Пн", "Вт", "Ср", "Чт", "Пт", "Сб", "Вс"][d] for d in sorted(odd_days))
+        selected_days_text = ", ".join(WEEKDAYS_RU[d] for d in sorted(odd_days))
         await query.message.edit_text(
             f"📅 <b>Настройка расписания для НЕЧЕТНЫХ недель</b>\n"
             f"✅ Выбраны дни: <b>{selected_days_text}</b>\n\n"
@@ -664,7 +664,7 @@ async def start_odd_time_mode(query, state: FSMContext) -> None:
     elif time_mode == "multiple":
         # Разное время для каждого дня
         first_day = sorted(odd_days)[0]
-        day_name = ["Пн", "Вт", "Ср", "Чт", "Пт", "Сб", "Вс"][first_day]
+        day_name = WEEKDAYS_RU[first_day]
         msg = await query.message.edit_text(
             f"⏰ <b>Настройка времени для каждого дня (нечетные недели)</b>\n\n"
             f"📅 День <b>1 из {len(odd_days)}</b>: <b>{day_name}</b>\n\n"
@@ -734,22 +734,20 @@ async def start_odd_time(message: Message, state: FSMContext, db: Database, sche
     if even_days:
         even_time_mode = data.get("even_time_mode", "single")
         if even_time_mode == "single" and even_time:
-            even_schedule_text = f"📅 <b>Четные недели:</b> {', '.join(['Пн','Вт','Ср','Чт','Пт','Сб','Вс'][d] for d in sorted(even_days))} в <b>{even_time}</b>\n"
+            even_schedule_text = f"📅 <b>Четные недели:</b> {', '.join(WEEKDAYS_RU[d] for d in sorted(even_days))} в <b>{even_time}</b>\n"
         elif even_time_mode == "multiple":
             even_day_times = data.get("even_day_times", {})
-            day_names = ['Пн','Вт','Ср','Чт','Пт','Сб','Вс']
-            schedule_items = [f"{day_names[d]} {even_day_times.get(d, '?')}" for d in sorted(even_days)]
+            schedule_items = [f"{WEEKDAYS_RU[d]} {even_day_times.get(d, '?')}" for d in sorted(even_days)]
             even_schedule_text = f"📅 <b>Четные недели:</b> {', '.join(schedule_items)}\n"
     
     odd_schedule_text = ""
     if odd_days:
         odd_time_mode = data.get("odd_time_mode", "single")
         if odd_time_mode == "single" and odd_time:
-            odd_schedule_text = f"📅 <b>Нечетные недели:</b> {', '.join(['Пн','Вт','Ср','Чт','Пт','Сб','Вс'][d] for d in sorted(odd_days))} в <b>{odd_time}</b>\n"
+            odd_schedule_text = f"📅 <b>Нечетные недели:</b> {', '.join(WEEKDAYS_RU[d] for d in sorted(odd_days))} в <b>{odd_time}</b>\n"
         elif odd_time_mode == "multiple":
             odd_day_times = data.get("odd_day_times", {})
-            day_names = ['Пн','Вт','Ср','Чт','Пт','Сб','Вс']
-            schedule_items = [f"{day_names[d]} {odd_day_times.get(d, '?')}" for d in sorted(odd_days)]
+            schedule_items = [f"{WEEKDAYS_RU[d]} {odd_day_times.get(d, '?')}" for d in sorted(odd_days)]
             odd_schedule_text = f"📅 <b>Нечетные недели:</b> {', '.join(schedule_items)}\n"
     
     await message.answer(
@@ -758,7 +756,7 @@ async def start_odd_time(message: Message, state: FSMContext, db: Database, sche
         f"{odd_schedule_text}\n"
         "📆 <b>Какая сейчас неделя по вашему графику?</b>\n"
         "(Это нужно для правильной синхронизации)",
-        reply_markup=week_parity_kb().as_markup(),
+        reply_markup=week_parity_markup(),
     )
 
 
@@ -810,10 +808,10 @@ async def start_odd_day_time(message: Message, state: FSMContext, db: Database,
     if next_index < len(odd_days):
         await state.update_data(odd_current_day_index=next_index)
         next_day = odd_days[next_index]
-        day_name = ["Пн", "Вт", "Ср", "Чт", "Пт", "Сб", "Вс"][next_day]
+        day_name = WEEKDAYS_RU[next_day]
         last_bot_message_id = data.get("odd_last_bot_message_id")
         text = (
-            f"✅ <b>Время для {['Пн','Вт','Ср','Чт','Пт','Сб','Вс'][current_day]} сохранено:</b> {time_str}\n\n"
+            f"✅ <b>Время для {WEEKDAYS_RU[current_day]} сохранено:</b> {time_str}\n\n"
             f"📅 День <b>{next_index + 1} из {len(odd_days)}</b>: <b>{day_name}</b>\n\n"
             "⏰ <b>Укажите время тренировки</b>\n"
             "Формат: <code>HH:MM</code>\n"
@@ -856,15 +854,13 @@ async def start_odd_day_time(message: Message, state: FSMContext, db: Database,
         if even_time_mode == "single":
             even_time = data.get("even_time")
             if even_time:
-                even_schedule_text = f"📅 <b>Четные недели:</b> {', '.join(['Пн','Вт','Ср','Чт','Пт','Сб','Вс'][d] for d in sorted(even_days))} в <b>{even_time}</b>\n"
+                even_schedule_text = f"📅 <b>Четные недели:</b> {', '.join(WEEKDAYS_RU[d] for d in sorted(even_days))} в <b>{even_time}</b>\n"
         elif even_time_mode == "multiple":
             even_day_times = data.get("even_day_times", {})
-            day_names = ['Пн','Вт','Ср','Чт','Пт','Сб','Вс']
-            schedule_items = [f"{day_names[d]} {even_day_times.get(d, '?')}" for d in sorted(even_days)]
+            schedule_items = [f"{WEEKDAYS_RU[d]} {even_day_times.get(d, '?')}" for d in sorted(even_days)]
             even_schedule_text = f"📅 <b>Четные недели:</b> {', '.join(schedule_items)}\n"
     
-    day_names = ['Пн','Вт','Ср','Чт','Пт','Сб','Вс']
-    schedule_items = [f"{day_names[d]} {odd_day_times.get(d, '?')}" for d in sorted(odd_days)]
+    schedule_items = [f"{WEEKDAYS_RU[d]} {odd_day_times.get(d, '?')}" for d in sorted(odd_days)]
     odd_schedule_text = f"📅 <b>Нечетные недели:</b> {', '.join(schedule_items)}\n"
     
     await message.answer(
@@ -873,7 +869,7 @@ async def start_odd_day_time(message: Message, state: FSMContext, db: Database,
         f"{odd_schedule_text}\n"
         "📆 <b>Какая сейчас неделя по вашему графику?</b>\n"
         "(Это нужно для правильной синхронизации)",
-        reply_markup=week_parity_kb().as_markup(),
+        reply_markup=week_parity_markup(),
     )
 
 
@@ -908,11 +904,11 @@ async def start_any_days(query, state: FSMContext) -> None:
             await query.answer("⚠️ Пожалуйста, выберите хотя бы один день", show_alert=True)
             return
         await state.set_state(StartStates.waiting_any_time_mode)
-        selected_days_text = ", ".join(["Пн", "Вт", "Ср", "Чт", "Пт", "Сб", "Вс"][d] for d in sorted(selected_days))
+        selected_days_text = ", ".join(WEEKDAYS_RU[d] for d in sorted(selected_days))
         await query.message.edit_text(
             f"✅ <b>Выбраны дни:</b> {selected_days_text}\n\n"
             "⏰ <b>Выберите режим настройки времени:</b>",
-            reply_markup=time_mode_kb().as_markup(),
+            reply_markup=time_mode_markup(),
         )
         await query.answer()
 
@@ -928,7 +924,7 @@ async def start_any_time_mode(query, state: FSMContext) -> None:
     if time_mode == "single":
         # Одно время для всех дней
         await state.set_state(StartStates.waiting_any_time)
-        selected_days_text = ", ".join(["Пн", "Вт", "Ср", "Чт", "Пт", "Сб", "Вс"][d] for d in sorted(days))
+        selected_days_text = ", ".join(WEEKDAYS_RU[d] for d in sorted(days))
         await query.message.edit_text(
             f"✅ <b>Выбраны дни:</b> {selected_days_text}\n\n"
             "⏰ <b>Укажите время тренировки</b>\n"
@@ -940,7 +936,7 @@ async def start_any_time_mode(query, state: FSMContext) -> None:
     elif time_mode == "multiple":
         # Разное время для каждого дня
         first_day = sorted(days)[0]
-        day_name = ["Пн", "Вт", "Ср", "Чт", "Пт", "Сб", "Вс"][first_day]
+        day_name = WEEKDAYS_RU[first_day]
         msg = await query.message.edit_text(
             f"⏰ <b>Настройка времени для каждого дня</b>\n\n"
             f"📅 День <b>1 из {len(days)}</b>: <b>{day_name}</b>\n\n"
@@ -996,8 +992,7 @@ async def start_any_time(message: Message, state: FSMContext, db: Database, sche
         ScheduleCreate(user_id=int(user_id), weekday=day, time=time_str, week_type="any")
         for day in days
     ]
-    for entry in schedules:
-        await queries.add_workout_schedule(db, entry)
+    await queries.add_workout_schedules(db, [entry.to_row() for entry in schedules])
     
     schedule = await queries.get_workout_schedule(db, int(user_id))
     schedule_user_jobs(
@@ -1018,7 +1013,7 @@ async def start_any_time(message: Message, state: FSMContext, db: Database, sche
     )
     await message.answer(
         f"✅ <b>Регистрация завершена!</b>\n\n{profile_text}",
-        reply_markup=main_menu_kb(config.admin_ids, message.from_user.id).as_markup(),
+        reply_markup=main_menu_markup(config.admin_ids, message.from_user.id),
     )
 
 
@@ -1070,10 +1065,10 @@ async def start_any_day_time(message: Message, state: FSMContext, db: Database,
     if next_index < len(days):
         await state.update_data(any_current_day_index=next_index)
         next_day = days[next_index]
-        day_name = ["Пн", "Вт", "Ср", "Чт", "Пт", "Сб", "Вс"][next_day]
+        day_name = WEEKDAYS_RU[next_day]
         last_bot_message_id = data.get("any_last_bot_message_id")
         text = (
-            f"✅ <b>Время для {['Пн','Вт','Ср','Чт','Пт','Сб','Вс'][current_day]} сохранено:</b> {time_str}\n\n"
+            f"✅ <b>Время для {WEEKDAYS_RU[current_day]} сохранено:</b> {time_str}\n\n"
             f"📅 День <b>{next_index + 1} из {len(days)}</b>: <b>{day_name}</b>\n\n"
             "⏰ <b>Укажите время тренировки</b>\n"
             "Формат: <code>HH:MM</code>\n"
@@ -1112,8 +1107,7 @@ async def start_any_day_time(message: Message, state: FSMContext, db: Database,
         ScheduleCreate(user_id=int(user_id), weekday=day, time=any_day_times[day], week_type="any")
         for day in days
     ]
-    for entry in schedules:
-        await queries.add_workout_schedule(db, entry)
+    await queries.add_workout_schedules(db, [entry.to_row() for entry in schedules])
     
     schedule = await queries.get_workout_schedule(db, int(user_id))
     schedule_user_jobs(
@@ -1133,7 +1127,7 @@ async def start_any_day_time(message: Message, state: FSMContext, db: Database,
     )
     await message.answer(
         f"✅ <b>Регистрация завершена!</b>\n\n{profile_text}",
-        reply_markup=main_menu_kb(config.admin_ids, message.from_user.id).as_markup(),
+        reply_markup=main_menu_markup(config.admin_ids, message.from_user.id),
     )
 
 
@@ -1145,6 +1139,7 @@ async def start_week_parity(
     scheduler,
     tz: ZoneInfo,
     config: Config,
+    now: datetime,
 ) -> None:
     if query.data is None or query.message is None or query.from_user is None:
         return
@@ -1166,7 +1161,7 @@ async def start_week_parity(
         return
 
     is_even_week = week_parity == "even"
-    offset = compute_week_parity_offset(datetime.now(tz), is_even_week)
+    offset = compute_week_parity_offset(now, is_even_week)
     await queries.update_week_parity_offset(db, int(user_id), offset)
 
     if setup_type == "separate":
@@ -1198,8 +1193,7 @@ async def start_week_parity(
                     if day in odd_day_times:
                         schedules.append(ScheduleCreate(user_id=int(user_id), weekday=day, time=odd_day_times[day], week_type="odd"))
         
-        for entry in schedules:
-            await queries.add_workout_schedule(db, entry)
+        await queries.add_workout_schedules(db, [entry.to_row() for entry in schedules])
     else:
         # Не должно быть здесь для "any", но на всякий случай
         pass
@@ -1219,9 +1213,7 @@ async def start_week_parity(
     await state.clear()
     
     # Показываем итоговое расписание
-    even_schedule = [s for s in schedule if s.get("week_type") == "even"]
-    odd_schedule = [s for s in schedule if s.get("week_type") == "odd"]
-    any_schedule = [s for s in schedule if s.get("week_type") == "any"]
+    even_schedule, odd_schedule, any_schedule = split_by_week_type(schedule)
     
     schedule_text = ""
     if even_schedule:
@@ -1237,6 +1229,6 @@ async def start_week_parity(
     )
     await query.message.answer(
         f"✅ <b>Регистрация завершена!</b>\n\n{profile_text}",
-        reply_markup=main_menu_kb(config.admin_ids, query.from_user.id).as_markup(),
+        reply_markup=main_menu_markup(config.admin_ids, query.from_user.id),
     )
     await query.answer()
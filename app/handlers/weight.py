@@ -16,7 +16,8 @@ from app.db.database import Database
 from app.db import queries
 from app.db.models import WeightEntry
 from app.handlers.calories import CalorieStates
-from app.utils.keyboards import main_menu_kb
+from app.handlers.common import require_user
+from app.utils.keyboards import main_menu_markup
 from app.utils.parsing import parse_weight
 
 
@@ -37,12 +38,8 @@ async def _save_weight(db: Database, user_id: int, weight: float, tz: ZoneInfo)
 async def weight_command(message: Message, state: FSMContext, db: Database, tz: ZoneInfo) -> None:
     if message.from_user is None:
         return
-    user = await queries.get_user_by_tg_id(db, message.from_user.id)
-    if not user:
-        await message.answer(
-            "👋 Привет!\n\n"
-            "Для начала работы выполните команду /start"
-        )
+    user = await require_user(message, db)
+    if user is None:
         return
 
     parts = message.text.split(maxsplit=1) if message.text else []
@@ -63,7 +60,7 @@ async def weight_command(message: Message, state: FSMContext, db: Database, tz:
         await message.answer(
             f"✅ <b>Вес сохранен!</b>\n\n"
             f"⚖️ Текущий вес: <b>{weight} кг</b>",
-            reply_markup=main_menu_kb().as_markup()
+            reply_markup=main_menu_markup()
         )
         return
 
@@ -82,12 +79,8 @@ async def weight_command(message: Message, state: FSMContext, db: Database, tz:
 async def weight_input(message: Message, state: FSMContext, db: Database, tz: ZoneInfo) -> None:
     if message.from_user is None or message.text is None:
         return
-    user = await queries.get_user_by_tg_id(db, message.from_user.id)
-    if not user:
-        await message.answer(
-            "👋 Привет!\n\n"
-            "Для начала работы выполните команду /start"
-        )
+    user = await require_user(message, db)
+    if user is None:
         await state.clear()
         return
 
@@ -115,7 +108,7 @@ async def weight_input(message: Message, state: FSMContext, db: Database, tz: Zo
     await message.answer(
         f"✅ <b>Вес сохранен!</b>\n\n"
         f"⚖️ Текущий вес: <b>{weight} кг</b>",
-        reply_markup=main_menu_kb().as_markup()
+        reply_markup=main_menu_markup()
     )
 
 
@@ -152,5 +145,5 @@ async def weight_fallback(message: Message, state: FSMContext, db: Database, tz:
     await message.answer(
         f"✅ <b>Вес сохранен!</b>\n\n"
         f"⚖️ Текущий вес: <b>{weight} кг</b>",
-        reply_markup=main_menu_kb().as_markup()
+        reply_markup=main_menu_markup()
     )
@@ -12,7 +12,8 @@ from aiogram.types import Message, CallbackQuery
 from app.db.database import Database
 from app.db import queries
 from app.db.models import WorkoutLogCreate
-from app.utils.keyboards import log_status_kb, main_menu_kb
+from app.handlers.common import START_REQUIRED_SHORT_TEXT, require_user
+from app.utils.keyboards import log_status_markup, main_menu_markup
 
 
 router = Router()
@@ -58,7 +59,7 @@ async def workout_callback(query: CallbackQuery, db: Database) -> None:
     user = await queries.get_user_by_tg_id(db, tg_id)
     if not user:
         logger.warning(f"⚠️ Попытка подтверждения тренировки несуществующим пользователем: tg_id={tg_id}")
-        await query.answer("👋 Для начала работы выполните /start", show_alert=True)
+        await query.answer(START_REQUIRED_SHORT_TEXT, show_alert=True)
         return
 
     try:
@@ -67,7 +68,7 @@ async def workout_callback(query: CallbackQuery, db: Database) -> None:
         logger.info(f"🏋️ Подтверждение тренировки: user_id={user_id}, tg_id={tg_id}, status={status}, date={workout_at.strftime('%Y-%m-%d %H:%M')}")
         
         log = WorkoutLogCreate(user_id=user_id, date=workout_at, status=status)
-        await queries.upsert_workout_log(db, log)
+        await queries.upsert_workout_log(db, log.to_row())
         logger.info(f"✅ Тренировка сохранена в БД: user_id={user_id}, status={status}")
 
         if status == "done":
@@ -93,12 +94,8 @@ async def workout_callback(query: CallbackQuery, db: Database) -> None:
 async def log_command(message: Message, state: FSMContext, db: Database, tz: ZoneInfo) -> None:
     if message.text is None or message.from_user is None:
         return
-    user = await queries.get_user_by_tg_id(db, message.from_user.id)
-    if not user:
-        await message.answer(
-            "👋 Привет!\n\n"
-            "Для начала работы выполните команду /start"
-        )
+    user = await require_user(message, db)
+    if user is None:
         return
 
     parts = message.text.split(maxsplit=1)
@@ -106,7 +103,7 @@ async def log_command(message: Message, state: FSMContext, db: Database, tz: Zon
         await state.set_state(LogStates.waiting_status)
         await message.answer(
             "Выберите статус тренировки:",
-            reply_markup=log_status_kb().as_markup(),
+            reply_markup=log_status_markup(),
         )
         return
 
@@ -148,19 +145,19 @@ async def log_command(message: Message, state: FSMContext, db: Database, tz: Zon
         duration=duration,
         notes=notes,
     )
-    await queries.upsert_workout_log(db, log)
+    await queries.upsert_workout_log(db, log.to_row())
 
     if status == "done":
         await message.answer(
             "✅ <b>Тренировка засчитана!</b>\n\n"
             "💪 Отличная работа! Продолжайте в том же духе!",
-            reply_markup=main_menu_kb().as_markup()
+            reply_markup=main_menu_markup()
         )
     else:
         await message.answer(
             "⚠️ <b>Пропуск зафиксирован</b>\n\n"
             "💪 Не расстраивайтесь! Следующая тренировка без срывов!",
-            reply_markup=main_menu_kb().as_markup()
+            reply_markup=main_menu_markup()
         )
 
 
@@ -185,18 +182,18 @@ async def log_status_input(query, state: FSMContext, db: Database, tz: ZoneInfo)
         date=workout_at,
         status=status,
     )
-    await queries.upsert_workout_log(db, log)
+    await queries.upsert_workout_log(db, log.to_row())
     await state.clear()
     if status == "done":
         await query.message.answer(
             "✅ <b>Тренировка засчитана!</b>\n\n"
             "💪 Отличная работа! Продолжайте в том же духе!",
-            reply_markup=main_menu_kb().as_markup()
+            reply_markup=main_menu_markup()
         )
     else:
         await query.message.answer(
             "⚠️ <b>Пропуск зафиксирован</b>\n\n"
             "💪 Не расстраивайтесь! Следующая тренировка без срывов!",
-            reply_markup=main_menu_kb().as_markup()
+            reply_markup=main_menu_markup()
         )
     await query.answer()
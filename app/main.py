@@ -13,10 +13,11 @@ from aiogram.types import CallbackQuery, Message, TelegramObject
 from app.bot import create_bot
 from app.config import load_config, Config
 from app.db.database import Database, init_db
+from app.db.loaders import user_loader_scope
 from app.db import queries
 from app.handlers import menu, start, schedule, workouts, weight, reports, profile, admin, calories, subscription
 from app.scheduler import create_scheduler, schedule_global_jobs, load_all_schedules
-from app.services.access import has_access, is_admin, PRODUCT_DESCRIPTION, get_product_price_text
+from app.services.access import has_access, PRODUCT_DESCRIPTION, get_product_price_text
 from app.utils.keyboards import paywall_kb
 
 
@@ -93,8 +94,15 @@ class ContextMiddleware(BaseMiddleware):
         data["db"] = self._db
         data["scheduler"] = self._scheduler
         data["tz"] = self._tz
+        # Текущее время считается один раз на апдейт; хендлеры принимают его как now
+        data["now"] = datetime.now(self._tz)
         data["config"] = self._config
-        return await handler(event, data)
+        # Флаг админа считается один раз на апдейт; хендлеры принимают его как is_admin
+        from_user = data.get("event_from_user")
+        data["is_admin"] = from_user is not None and from_user.id in self._config.admin_ids
+        # Повторные get_user_by_tg_id за время апдейта (middleware + хендлер) — один запрос к БД
+        with user_loader_scope(self._db):
+            return await handler(event, data)
 
 
 async def _paywall_text(db: Database) -> str:
@@ -135,7 +143,7 @@ class AccessMiddleware(BaseMiddleware):
             return await handler(event, data)
 
         tg_id = user_tg.id
-        if is_admin(tg_id, config):
+        if data.get("is_admin"):
             return await handler(event, data)
 
         if isinstance(event, Message) and event.text:
@@ -148,6 +156,8 @@ class AccessMiddleware(BaseMiddleware):
         u = await queries.get_user_by_tg_id(db, tg_id)
         if not u:
             return await handler(event, data)
+        # Хендлеры могут взять уже загруженного пользователя из data["user"]
+        data["user"] = u
 
         if await has_access(db, tg_id, u, config, tz):
             return await handler(event, data)
@@ -178,14 +188,17 @@ async def main() -> None:
 
         tz = ZoneInfo(config.timezone)
         config.db_path.parent.mkdir(parents=True, exist_ok=True)
-        logger.info(f"📁 Путь к БД: {config.db_path}")
+        logger.info(f"📁 Путь к БД: {config.db_path}, читателей в пуле: {config.db_readers}")
         
-        db = Database(str(config.db_path))
+        db = Database(str(config.db_path), readers=config.db_readers)
         await db.connect()
         logger.info("✅ Подключение к базе данных установлено")
         
-        await init_db(db)
+        await init_db(db, tz)
         logger.info("✅ База данных инициализирована")
+        await queries.warm_statement_cache(db)
+        cached_users = await queries.warm_user_cache(db)
+        logger.info(f"✅ Кэш пользователей прогрет: {cached_users}")
 
         bot = create_bot(config)
         logger.info("✅ Telegram бот создан")
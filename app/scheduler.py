@@ -24,6 +24,7 @@ from app.services.analytics import build_monthly_report, previous_month_range
 from app.services.discipline import is_week_allowed
 from app.services.payment import check_pending_payments, process_recurring_payments
 from app.utils.charts import build_weight_chart
+from app.utils.parsing import WEEKDAYS_RU
 
 
 def _adjust_time(weekday: int, hour: int, minute: int, delta_minutes: int) -> tuple[int, int, int]:
@@ -114,8 +115,8 @@ async def _weekly_weight_job(bot: Bot, db: Database, tz: ZoneInfo) -> None:
     logger.info(f"👥 Найдено пользователей для уведомления: {len(users)}")
     
     for user in users:
-        user_id = int(user["id"])
-        tg_id = int(user["tg_id"])
+        user_id = user.id
+        tg_id = user.tg_id
         
         try:
             # Получаем последний вес для сравнения
@@ -123,8 +124,8 @@ async def _weekly_weight_job(bot: Bot, db: Database, tz: ZoneInfo) -> None:
             last_weight_text = ""
             if latest_weight:
                 last_weight = float(latest_weight["weight"])
-                last_date = datetime.fromisoformat(latest_weight["date"])
-                days_ago = (datetime.now(tz) - last_date.replace(tzinfo=tz)).days
+                last_date = datetime.fromtimestamp(latest_weight["date"], tz)
+                days_ago = (datetime.now(tz) - last_date).days
                 if days_ago > 0:
                     last_weight_text = f"\n📊 Последний вес: <b>{last_weight:.1f} кг</b> ({days_ago} дн. назад)"
                 logger.debug(f"📊 Пользователь {user_id}: последний вес {last_weight:.1f} кг ({days_ago} дн. назад)")
@@ -148,9 +149,9 @@ async def _monthly_report_job(bot: Bot, db: Database, tz: ZoneInfo) -> None:
     users = await queries.list_users(db)
     report_start, report_end = previous_month_range(datetime.now(tz))
     for user in users:
-        user_id = int(user["id"])
-        tg_id = int(user["tg_id"])
-        week_parity_offset = int(user.get("week_parity_offset") or 0)
+        user_id = user.id
+        tg_id = user.tg_id
+        week_parity_offset = user.week_parity_offset or 0
         report = await build_monthly_report(db, user_id, report_start, report_end, week_parity_offset)
 
         start_weight_str = f"{report.start_weight:.1f} кг" if report.start_weight is not None else "нет данных"
@@ -224,8 +225,7 @@ def schedule_user_jobs(
         week_type = entry.get("week_type", "any")
         hour, minute = _parse_time(time_str)
         
-        weekday_names = ["Пн", "Вт", "Ср", "Чт", "Пт", "Сб", "Вс"]
-        logger.debug(f"  📋 Запись расписания: {weekday_names[weekday]} {time_str} (week_type={week_type})")
+        logger.debug(f"  📋 Запись расписания: {WEEKDAYS_RU[weekday]} {time_str} (week_type={week_type})")
 
         # Напоминания: за 24ч, 12ч, 6ч, 3ч, 2ч, 1ч до тренировки
         reminder_times = [
@@ -355,9 +355,9 @@ async def load_all_schedules(scheduler: AsyncIOScheduler, db: Database, bot: Bot
     
     total_jobs = 0
     for user in users:
-        user_id = int(user["id"])
-        tg_id = int(user["tg_id"])
-        week_parity_offset = int(user.get("week_parity_offset") or 0)
+        user_id = user.id
+        tg_id = user.tg_id
+        week_parity_offset = user.week_parity_offset or 0
         schedule = await queries.get_workout_schedule(db, user_id)
         
         jobs_before = len([j for j in scheduler.get_jobs() if j.id.startswith(f"user:{user_id}:")])
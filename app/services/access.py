@@ -39,7 +39,7 @@ async def get_product_price_text(db: Database) -> str:
 
 
 def is_admin(tg_id: int, config: Config) -> bool:
-    return config.admin_ids and tg_id in config.admin_ids
+    return tg_id in config.admin_ids
 
 
 async def has_access(
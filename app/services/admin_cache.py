@@ -0,0 +1,31 @@
+"""
+Кэш готовых текстов админ-панели (статистика, список пользователей).
+"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+from app.db.cache import TTLCache
+
+ADMIN_CACHE_TTL_SECONDS = 60.0
+
+# Ключ — раздел панели ("stats", "users"), значение — готовый текст.
+# Любая запись в users (регистрация, вес-цель, параметры, подписка) сбрасывает кэш через
+# queries._forget_user / create_user, поэтому число и список пользователей не отстают.
+# Счётчики тренировок, взвешиваний и расписаний пишутся постоянно (в том числе планировщиком)
+# и сознательно не сбрасывают кэш — в статистике они отстают не больше чем на TTL
+_texts: TTLCache[str, str] = TTLCache(8, ADMIN_CACHE_TTL_SECONDS)
+
+
+def get_admin_text(key: str) -> Optional[str]:
+    return _texts.get(key)
+
+
+def set_admin_text(key: str, text: str) -> None:
+    _texts.set(key, text)
+
+
+def invalidate_admin_caches() -> None:
+    """Сбросить готовые тексты админ-панели (после записи в users)."""
+    _texts.clear()
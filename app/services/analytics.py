@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Optional
@@ -42,16 +43,19 @@ async def build_monthly_report(
     end: datetime,
     week_parity_offset: int,
 ) -> MonthlyReport:
-    schedule = await queries.get_workout_schedule(db, user_id)
-    stats = await queries.get_workout_stats(db, user_id, start, end)
+    schedule, stats, weights = await asyncio.gather(
+        queries.get_workout_schedule(db, user_id),
+        queries.get_workout_stats(db, user_id, start, end),
+        # Ряд весов за период нужен для графика; первое и последнее взвешивание берём из него же
+        queries.get_weights_between(db, user_id, start, end),
+    )
     scheduled = count_scheduled_workouts(schedule, start, end, week_parity_offset)
     score = calculate_discipline_score(stats["done"], scheduled)
 
-    first_weight = await queries.get_first_weight_between(db, user_id, start, end)
-    last_weight = await queries.get_last_weight_between(db, user_id, start, end)
+    weight_points = [(datetime.fromtimestamp(w["date"], start.tzinfo), float(w["weight"])) for w in weights]
 
-    start_weight = first_weight["weight"] if first_weight else None
-    end_weight = last_weight["weight"] if last_weight else None
+    start_weight = weights[0]["weight"] if weights else None
+    end_weight = weights[-1]["weight"] if weights else None
 
     diff = None
     diff_percent = None
@@ -60,9 +64,6 @@ async def build_monthly_report(
         if start_weight != 0:
             diff_percent = round((diff / start_weight) * 100, 2)
 
-    weights = await queries.get_weights_between(db, user_id, start, end)
-    weight_points = [(datetime.fromisoformat(w["date"]), float(w["weight"])) for w in weights]
-
     return MonthlyReport(
         start_weight=start_weight,
         end_weight=end_weight,
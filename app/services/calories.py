@@ -7,6 +7,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
 from typing import Literal
 
 # Коэффициенты активности (Total Daily Energy Expenditure = BMR × multiplier)
@@ -89,7 +90,7 @@ def age_from_birth_year(birth_year: int, now: datetime | None = None) -> int:
     return max(0, n.year - birth_year)
 
 
-@dataclass
+@dataclass(frozen=True)
 class CalorieProfile:
     """Результат расчёта: BMR, TDEE, ИМТ, целевые калории."""
     bmr: float
@@ -113,6 +114,21 @@ def compute_calorie_profile(
     Считает BMR, TDEE, ИМТ и целевую калорийность.
     Возвращает None, если не хватает данных (рост, год рождения, пол).
     """
+    # Из даты нужен только год (возраст), поэтому результат кэшируется по входным данным и году
+    year = (now or datetime.now()).year
+    return _calorie_profile(weight_kg, height_cm, birth_year, gender, activity_level, goal, year)
+
+
+@lru_cache(maxsize=4096)
+def _calorie_profile(
+    weight_kg: float,
+    height_cm: float | None,
+    birth_year: int | None,
+    gender: str | None,
+    activity_level: str | None,
+    goal: str | None,
+    year: int,
+) -> CalorieProfile | None:
     if not height_cm or height_cm <= 0 or not birth_year or birth_year <= 0:
         return None
     g = (gender or "m").strip().lower()
@@ -125,7 +141,7 @@ def compute_calorie_profile(
     if gl not in ("lose", "maintain", "gain"):
         gl = "maintain"
 
-    age = age_from_birth_year(birth_year, now)
+    age = max(0, year - birth_year)
     bmr_val = bmr_mifflin_st_jeor(weight_kg, height_cm, age, g)
     tdee_val = tdee(bmr_val, act)
     bmi_val = bmi(weight_kg, height_cm)
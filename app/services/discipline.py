@@ -42,20 +42,21 @@ def count_scheduled_workouts(
     if start > end:
         return 0
 
+    # Тип недели нормализуется один раз на запись, а не на каждый день периода
     schedule_by_weekday: dict[int, list[str]] = {}
     for entry in schedule:
         weekday = int(entry["weekday"])
-        schedule_by_weekday.setdefault(weekday, []).append(entry.get("week_type", "any"))
+        schedule_by_weekday.setdefault(weekday, []).append(entry.get("week_type", "any").lower().strip())
 
     current = start.date()
     end_date = end.date()
     total = 0
     while current <= end_date:
-        week_types = schedule_by_weekday.get(current.weekday(), [])
+        week_types = schedule_by_weekday.get(current.weekday())
         if week_types:
-            target_dt = datetime.combine(current, datetime.min.time(), tzinfo=start.tzinfo)
-            for week_type in week_types:
-                if is_week_allowed(target_dt, week_parity_offset, week_type):
-                    total += 1
+            # Четность недели считается один раз на день; не подходит только противоположный тип (как в is_week_allowed)
+            parity = current.isocalendar().week % 2
+            skipped = "odd" if (parity + week_parity_offset) % 2 == 0 else "even"
+            total += sum(week_type != skipped for week_type in week_types)
         current += timedelta(days=1)
     return total
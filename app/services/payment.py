@@ -108,7 +108,7 @@ async def _process_success_payment(
         logger.warning(f"⚠️ Платеж не найден в БД: label={payment_label}")
         return
 
-    if payment_db.get("status") == "succeeded":
+    if payment_db["status"] == "succeeded":
         logger.info(f"ℹ️ Платеж уже подтвержден: label={payment_label}")
         return
 
@@ -193,7 +193,7 @@ async def check_pending_payments(
         logger.info(f"⏰ Найдено {len(pending_payments)} pending платежей")
 
         for payment in pending_payments:
-            label = payment.get("payment_id")
+            label = payment["payment_id"]
             if not label:
                 continue
             try:
@@ -205,7 +205,7 @@ async def check_pending_payments(
             if status == "success":
                 if amount is not None:
                     try:
-                        expected = float(payment.get("amount", 0))
+                        expected = float(payment["amount"])
                         if not _amounts_close(float(amount), expected):
                             logger.warning(
                                 f"⚠️ Сумма не совпадает для {label}: ожидали {expected}, пришло {amount}"
@@ -276,13 +276,7 @@ async def process_recurring_payments(
     for sub in subscriptions:
         user_id = int(sub["user_id"])
         amount = float(sub["amount"])
-
-        user = await queries.get_user_by_id(db, user_id)
-        if not user:
-            logger.warning(f"⚠️ Пользователь не найден: user_id={user_id}")
-            continue
-
-        tg_id = int(user["tg_id"])
+        tg_id = int(sub["tg_id"])
 
         try:
             # Для Quickpay отправляем напоминание об оплате
@@ -44,13 +44,12 @@ async def mark_missed_if_no_response(
     tg_id: int,
     workout_at: datetime,
 ) -> None:
-    if await queries.workout_log_exists(db, user_id, workout_at):
+    log = WorkoutLogCreate(user_id=user_id, date=workout_at, status="missed")
+    # Пропуск записывается, только если пользователь ещё не ответил (иначе запись уже есть)
+    if not await queries.insert_workout_log_if_absent(db, log.to_row()):
         logger.debug(f"ℹ️ Тренировка уже залогирована: user_id={user_id}, date={workout_at}")
         return
-    
-    logger.info(f"⚠️ Тренировка не подтверждена, отмечаем как пропуск: user_id={user_id}, date={workout_at}")
-    log = WorkoutLogCreate(user_id=user_id, date=workout_at, status="missed")
-    await queries.upsert_workout_log(db, log)
+    logger.info(f"⚠️ Тренировка не подтверждена, отмечена как пропуск: user_id={user_id}, date={workout_at}")
     
     try:
         await bot.send_message(
@@ -3,33 +3,51 @@ from __future__ import annotations
 import asyncio
 from datetime import datetime
 from io import BytesIO
+from threading import Lock
 from typing import Iterable
 
 import matplotlib
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+
+from app.db.cache import TTLCache
 
 matplotlib.use("Agg")
 
+# Готовые PNG по ряду точек: повторное открытие отчета без новых взвешиваний не перерисовывает график
+_CHART_CACHE: TTLCache[tuple[tuple[datetime, float], ...], bytes] = TTLCache(maxsize=256, ttl=3600)
+
+# Одна фигура на процесс: оси, подписи и линия создаются один раз, при отрисовке меняются только данные.
+# Рисуют из потоков (asyncio.to_thread), поэтому фигура под замком
+_FIGURE = Figure(figsize=(7, 4))
+_AX = _FIGURE.subplots()
+_AX.xaxis_date()
+(_LINE,) = _AX.plot([], [], marker="o", linewidth=2, color="#1f77b4")
+_AX.set_title("Динамика веса")
+_AX.set_xlabel("Дата")
+_AX.set_ylabel("Вес, кг")
+_AX.grid(True, alpha=0.3)
+_FIGURE_LOCK = Lock()
+
 
 def _build_chart(weights: Iterable[tuple[datetime, float]]) -> bytes:
     dates = [item[0] for item in weights]
     values = [item[1] for item in weights]
 
-    fig, ax = plt.subplots(figsize=(7, 4))
-    ax.plot(dates, values, marker="o", linewidth=2, color="#1f77b4")
-    ax.set_title("Динамика веса")
-    ax.set_xlabel("Дата")
-    ax.set_ylabel("Вес, кг")
-    ax.grid(True, alpha=0.3)
-    fig.autofmt_xdate()
-
     buffer = BytesIO()
-    fig.tight_layout()
-    fig.savefig(buffer, format="png", dpi=150)
-    plt.close(fig)
-    buffer.seek(0)
-    return buffer.read()
+    with _FIGURE_LOCK:
+        _LINE.set_data(dates, values)
+        _AX.relim()
+        _AX.autoscale_view()
+        _FIGURE.autofmt_xdate()
+        _FIGURE.tight_layout()
+        _FIGURE.savefig(buffer, format="png", dpi=150)
+    return buffer.getvalue()
 
 
 async def build_weight_chart(weights: Iterable[tuple[datetime, float]]) -> bytes:
-    return await asyncio.to_thread(_build_chart, weights)
+    key = tuple(weights)
+    chart = _CHART_CACHE.get(key)
+    if chart is None:
+        chart = await asyncio.to_thread(_build_chart, key)
+        _CHART_CACHE.set(key, chart)
+    return chart
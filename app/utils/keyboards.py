@@ -1,6 +1,9 @@
 from __future__ import annotations
 
+from functools import lru_cache
 from typing import Optional
+
+from aiogram.types import InlineKeyboardMarkup
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 
 
@@ -20,6 +23,11 @@ def log_status_kb() -> InlineKeyboardBuilder:
     return builder
 
 
+@lru_cache(maxsize=1)
+def log_status_markup() -> InlineKeyboardMarkup:
+    return log_status_kb().as_markup()
+
+
 def paywall_kb(price: float = 299.0) -> InlineKeyboardBuilder:
     builder = InlineKeyboardBuilder()
     builder.button(text=f"Оплатить {price:.0f} ₽/мес", callback_data="pay:month")
@@ -40,7 +48,7 @@ def subscription_kb(pay_now: bool = False, extend: bool = False, price: float =
     return builder
 
 
-def main_menu_kb(admin_ids: Optional[list[int]] = None, user_id: Optional[int] = None) -> InlineKeyboardBuilder:
+def _main_menu_builder(is_admin: bool) -> InlineKeyboardBuilder:
     builder = InlineKeyboardBuilder()
     builder.button(text="Профиль", callback_data="menu:profile")
     builder.button(text="Подписка", callback_data="menu:subscription")
@@ -50,7 +58,7 @@ def main_menu_kb(admin_ids: Optional[list[int]] = None, user_id: Optional[int] =
     builder.button(text="Отчет", callback_data="menu:report")
     builder.button(text="Статистика", callback_data="menu:stats")
 
-    if admin_ids and user_id and user_id in admin_ids:
+    if is_admin:
         builder.button(text="🔐 Админ-панель", callback_data="menu:admin")
         builder.adjust(2, 2, 2, 1, 1)
     else:
@@ -59,6 +67,16 @@ def main_menu_kb(admin_ids: Optional[list[int]] = None, user_id: Optional[int] =
     return builder
 
 
+@lru_cache(maxsize=2)
+def _main_menu_markup(is_admin: bool) -> InlineKeyboardMarkup:
+    return _main_menu_builder(is_admin).as_markup()
+
+
+def main_menu_markup(admin_ids: Optional[frozenset[int]] = None, user_id: Optional[int] = None) -> InlineKeyboardMarkup:
+    """Готовая разметка главного меню: вариантов всего два (с админ-панелью и без), строятся один раз."""
+    return _main_menu_markup(bool(admin_ids and user_id and user_id in admin_ids))
+
+
 def weekdays_kb(selected: list[int]) -> InlineKeyboardBuilder:
     builder = InlineKeyboardBuilder()
     labels = {
@@ -100,6 +118,11 @@ def week_parity_kb() -> InlineKeyboardBuilder:
     return builder
 
 
+@lru_cache(maxsize=1)
+def week_parity_markup() -> InlineKeyboardMarkup:
+    return week_parity_kb().as_markup()
+
+
 def schedule_mode_kb() -> InlineKeyboardBuilder:
     builder = InlineKeyboardBuilder()
     builder.button(text="✏️ Редактировать четные недели", callback_data="schedulemode:even")
@@ -110,6 +133,11 @@ def schedule_mode_kb() -> InlineKeyboardBuilder:
     return builder
 
 
+@lru_cache(maxsize=1)
+def schedule_mode_markup() -> InlineKeyboardMarkup:
+    return schedule_mode_kb().as_markup()
+
+
 def time_mode_kb() -> InlineKeyboardBuilder:
     builder = InlineKeyboardBuilder()
     builder.button(text="Одно время для всех дней", callback_data="timemode:single")
@@ -118,6 +146,11 @@ def time_mode_kb() -> InlineKeyboardBuilder:
     return builder
 
 
+@lru_cache(maxsize=1)
+def time_mode_markup() -> InlineKeyboardMarkup:
+    return time_mode_kb().as_markup()
+
+
 def gender_kb() -> InlineKeyboardBuilder:
     b = InlineKeyboardBuilder()
     b.button(text="Мужской", callback_data="gender:m")
@@ -126,6 +159,11 @@ def gender_kb() -> InlineKeyboardBuilder:
     return b
 
 
+@lru_cache(maxsize=1)
+def gender_markup() -> InlineKeyboardMarkup:
+    return gender_kb().as_markup()
+
+
 def activity_kb() -> InlineKeyboardBuilder:
     b = InlineKeyboardBuilder()
     b.button(text="Почти нет движения", callback_data="activity:sedentary")
@@ -137,6 +175,11 @@ def activity_kb() -> InlineKeyboardBuilder:
     return b
 
 
+@lru_cache(maxsize=1)
+def activity_markup() -> InlineKeyboardMarkup:
+    return activity_kb().as_markup()
+
+
 def goal_kb() -> InlineKeyboardBuilder:
     b = InlineKeyboardBuilder()
     b.button(text="Похудение", callback_data="goal:lose")
@@ -146,6 +189,11 @@ def goal_kb() -> InlineKeyboardBuilder:
     return b
 
 
+@lru_cache(maxsize=1)
+def goal_markup() -> InlineKeyboardMarkup:
+    return goal_kb().as_markup()
+
+
 def admin_panel_kb() -> InlineKeyboardBuilder:
     builder = InlineKeyboardBuilder()
     builder.button(text="📊 Статистика бота", callback_data="admin:stats")
@@ -157,3 +205,9 @@ def admin_panel_kb() -> InlineKeyboardBuilder:
     builder.button(text="🔙 Назад", callback_data="admin:back")
     builder.adjust(1, 1, 1, 1, 1, 1, 1)
     return builder
+
+
+@lru_cache(maxsize=1)
+def admin_panel_markup() -> InlineKeyboardMarkup:
+    """Готовая разметка админ-панели (не зависит от пользователя — строится один раз)."""
+    return admin_panel_kb().as_markup()
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from functools import lru_cache
 from typing import Iterable
 
 from pydantic import ValidationError
@@ -7,6 +8,9 @@ from pydantic import ValidationError
 from app.db.models import WeekdaysInput
 
 
+# Короткие названия дней недели (индекс — weekday, 0 = понедельник)
+WEEKDAYS_RU: tuple[str, ...] = ("Пн", "Вт", "Ср", "Чт", "Пт", "Сб", "Вс")
+
 WEEKDAY_MAP = {
     "пн": 0,
     "пон": 0,
@@ -118,6 +122,20 @@ def parse_calories(value: str) -> int:
     return n
 
 
+def split_by_week_type(schedule: Iterable[dict]) -> tuple[list[dict], list[dict], list[dict]]:
+    """Раскладывает расписание на (четные, нечетные, все недели) за один проход."""
+    even: list[dict] = []
+    odd: list[dict] = []
+    any_: list[dict] = []
+    buckets = {"even": even.append, "odd": odd.append, "any": any_.append}
+    for item in schedule:
+        # week_type в workout_schedule — NOT NULL из фиксированного набора значений
+        append = buckets.get(item["week_type"])
+        if append is not None:
+            append(item)
+    return even, odd, any_
+
+
 def format_schedule(schedule: Iterable[dict], include_week_type: bool = False) -> str:
     """
     Форматирует расписание для отображения.
@@ -127,22 +145,17 @@ def format_schedule(schedule: Iterable[dict], include_week_type: bool = False) -
         include_week_type: Если True, добавляет метки (четные)/(нечетные) к каждому дню.
                           Если False (по умолчанию), метки не добавляются (для использования в секциях)
     """
-    mapping = {
-        0: "Пн",
-        1: "Вт",
-        2: "Ср",
-        3: "Чт",
-        4: "Пт",
-        5: "Сб",
-        6: "Вс",
-    }
-    
+    # Расписание меняется редко, а показывается часто: готовый текст кэшируется по набору записей
+    # (порядок и повторы записей на результат не влияют)
+    rows = frozenset((int(item['weekday']), item['time'], item.get('week_type', 'any')) for item in schedule)
+    return _format_schedule_rows(rows, include_week_type)
+
+
+@lru_cache(maxsize=4096)
+def _format_schedule_rows(rows: frozenset[tuple[int, str, str]], include_week_type: bool) -> str:
     # Группируем по дню и времени
     grouped: dict[tuple[int, str], set[str]] = {}
-    for item in schedule:
-        weekday = int(item['weekday'])
-        time_str = item['time']
-        week_type = item.get('week_type', 'any')
+    for weekday, time_str, week_type in rows:
         key = (weekday, time_str)
         if key not in grouped:
             grouped[key] = set()
@@ -151,7 +164,7 @@ def format_schedule(schedule: Iterable[dict], include_week_type: bool = False) -
     # Формируем строки
     items = []
     for (weekday, time_str), week_types in sorted(grouped.items()):
-        day_label = mapping[weekday]
+        day_label = WEEKDAYS_RU[weekday]
         
         if include_week_type:
             # Обрабатываем типы недель (старый формат с метками)
@@ -182,15 +195,43 @@ def format_schedule(schedule: Iterable[dict], include_week_type: bool = False) -
     return ", ".join(items) if items else "нет"
 
 
+# Заголовки секций расписания и признак "показывать секцию пустой" при show_empty
+_SCHEDULE_SECTIONS = (
+    ("📅 <b>Четные недели:</b>\n", True),
+    ("📅 <b>Нечетные недели:</b>\n", True),
+    ("📅 <b>Все недели:</b>\n", False),
+)
+
+
+def render_schedule_sections(schedule: Iterable[dict], show_empty: bool = False) -> str:
+    """
+    Текст расписания по секциям: четные, нечетные и все недели.
+
+    Args:
+        schedule: Список записей расписания
+        show_empty: Если True, секции четных и нечетных недель выводятся и без записей
+    """
+    # Как и в format_schedule, готовый текст кэшируется по набору записей
+    rows = frozenset((int(item["weekday"]), item["time"], item["week_type"]) for item in schedule)
+    return _render_schedule_rows(rows, show_empty)
+
+
+@lru_cache(maxsize=4096)
+def _render_schedule_rows(rows: frozenset[tuple[int, str, str]], show_empty: bool) -> str:
+    buckets: dict[str, list[tuple[int, str, str]]] = {"even": [], "odd": [], "any": []}
+    for row in rows:
+        bucket = buckets.get(row[2])
+        if bucket is not None:
+            bucket.append(row)
+    parts = []
+    for (title, required), bucket in zip(_SCHEDULE_SECTIONS, buckets.values()):
+        if bucket:
+            parts.append(title + _format_schedule_rows(frozenset(bucket), False))
+        elif show_empty and required:
+            parts.append(title + "⚠️ не настроено")
+    return "\n\n".join(parts) if parts else "⚠️ Расписание не настроено"
+
+
 def format_days(days: Iterable[int]) -> str:
-    mapping = {
-        0: "Пн",
-        1: "Вт",
-        2: "Ср",
-        3: "Чт",
-        4: "Пт",
-        5: "Сб",
-        6: "Вс",
-    }
-    ordered = [mapping[day] for day in sorted(set(days)) if day in mapping]
+    ordered = [WEEKDAYS_RU[day] for day in sorted(set(days)) if 0 <= day < len(WEEKDAYS_RU)]
     return " ".join(ordered) if ordered else "нет"